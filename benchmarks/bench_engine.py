@@ -0,0 +1,63 @@
+"""
+CounterEngine 처리량 벤치마크 (Qt 없이 클릭/취소 이벤트 처리 속도 측정)
+
+사용법: python benchmarks/bench_engine.py [이벤트 수] [--journal]
+  --journal: 임시 폴더의 ClickJournal에 실제로 기록 (기본은 저널 없음)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from counter_engine import CounterEngine
+from counter_storage import ClickJournal
+
+KEYS = ['7', '8', '9', '4', '5', '6', '1', '2', '3', '0', '/', '*', '.']
+UNDO_RATIO = 0.02  # 전체 이벤트 중 취소 비율
+
+
+def run(events, journal=None):
+    engine = CounterEngine(journal=journal)
+    for i, key in enumerate(KEYS):
+        engine.register_user(key, f"사용자{i + 1}")
+
+    random.seed(0)
+    actions = [None if random.random() < UNDO_RATIO else random.choice(KEYS)
+               for _ in range(events)]
+
+    start = time.perf_counter()
+    for key in actions:
+        if key is None:
+            engine.undo()
+        else:
+            engine.increment(key)
+    elapsed = time.perf_counter() - start
+    return engine, elapsed
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    events = int(args[0]) if args else 1000000
+
+    if "--journal" in sys.argv:
+        with tempfile.TemporaryDirectory() as data_dir:
+            journal = ClickJournal(os.path.join(data_dir, "journal.jsonl"))
+            engine, elapsed = run(events, journal)
+            journal.close()
+        label = "저널 기록 포함"
+    else:
+        engine, elapsed = run(events)
+        label = "저널 없음"
+
+    print(f"이벤트 {events}개 ({label}): {elapsed:.3f}초, "
+          f"초당 {events / elapsed:,.0f}개, 이벤트당 {elapsed / events * 1e6:.2f}µs")
+    print(f"총 카운트 {engine.total_count()}, 클릭 기록 {len(engine.click_history)}개, "
+          f"로그 {len(engine.logs)}줄")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+저장 형식 벤치마크 (이전 형식 vs 버전 2 압축 형식)
+
+프리셋은 CounterEngine으로 실제 클릭을 흉내 내어 만들고(사용자 {키: 이름/카운트/순서},
+ClickHistory, 클릭 시각), 버전 2는 저장 스레드가 받는 스냅샷 그대로 인코딩한다.
+이전 형식은 presets.json에 쓰던 모양 그대로 (들여쓰기 + [이름, 카운트] 쌍).
+
+사용법: python benchmarks/bench_format.py [클릭 수]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from counter_engine import CounterEngine
+from counter_storage import (JsonSerializer, OrjsonSerializer, MsgpackSerializer,
+                             encode_preset, decode_preset)
+
+KEYS = ['7', '8', '9', '4', '5', '6', '1', '2', '3', '0', '/', '*', '.']
+NAMES = ["김민준", "이서연", "박지호", "최수아", "정도윤", "강하은", "조시우",
+         "윤지유", "장예준", "임서윤", "한주원", "오채원", "신건우"]
+REPEAT = 20
+
+
+def make_preset(clicks):
+    """벤치마크용 프리셋 스냅샷 (13명, clicks번 클릭, 클릭 간격 0.5~5초)"""
+    random.seed(0)
+    now = [1_700_000_000 * 10**9]
+
+    def clock():
+        now[0] += random.randint(500, 5000) * 10**6
+        return now[0]
+
+    engine = CounterEngine(clock=clock)
+    for key, name in zip(KEYS, NAMES):
+        engine.register_user(key, name)
+    for _ in range(clicks):
+        engine.increment(random.choice(KEYS))
+    changed_presets, _ = engine.snapshot_presets()
+    return changed_presets[0]
+
+
+def legacy_preset(preset):
+    """이전 presets.json에 들어가던 프리셋 (시각 없음, 클릭은 [이름, 카운트])"""
+    return {"name": preset["name"], "users": preset["users"],
+            "click_history": list(preset["click_history"])}
+
+
+def measure(func):
+    """REPEAT번 실행한 평균 시간 (ms)"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func()
+    return (time.perf_counter() - start) / REPEAT * 1000, result
+
+
+def main():
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    preset = make_preset(clicks)
+    legacy = legacy_preset(preset)
+    rows = []
+
+    # 이전 형식: 들여쓰기 + [이름, 카운트] 쌍
+    encode_ms, payload = measure(
+        lambda: json.dumps(legacy, ensure_ascii=False, indent=2).encode('utf-8'))
+    decode_ms, _ = measure(lambda: json.loads(payload))
+    rows.append(("legacy json indent=2", len(payload), encode_ms, decode_ms))
+
+    for serializer_class in (JsonSerializer, OrjsonSerializer, MsgpackSerializer):
+        try:
+            serializer = serializer_class()
+        except ImportError:
+            print(f"{serializer_class.name}: 설치되어 있지 않음 (건너뜀)")
+            continue
+        encode_ms, payload = measure(lambda: serializer.dumps(encode_preset(preset)))
+        decode_ms, decoded = measure(lambda: decode_preset(serializer.loads(payload)))
+        assert decoded["click_history"] == legacy["click_history"]
+        assert decoded["users"] == preset["users"]
+        assert decoded["click_times"] == list(preset["click_history"].times)
+        rows.append((f"v2 {serializer.name}", len(payload), encode_ms, decode_ms))
+
+    print(f"클릭 {clicks}회, 사용자 {len(NAMES)}명, {REPEAT}회 평균 (v2는 클릭 시각 포함)")
+    print(f"{'형식':<24}{'크기(bytes)':>14}{'인코딩(ms)':>14}{'디코딩(ms)':>14}")
+    for label, size, encode_ms, decode_ms in rows:
+        print(f"{label:<24}{size:>14}{encode_ms:>14.2f}{decode_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+넘패드 버튼 갱신 비용 벤치마크 (클릭 한 번의 스타일/그리기 처리 시간)
+
+이전 방식: 자식 라벨 4개짜리 버튼에 클릭마다 여러 줄짜리 CSS를 새로 만들어 setStyleSheet
+현재 방식: 캐시된 버튼 면 위에 텍스트만 paintEvent에서 그림 (자식 라벨 없음)
+
+사용법: python benchmarks/bench_styles.py [클릭 수]
+PySide6 필요 (requirements.txt 범위, 6.12 제외), 화면 없이 실행 (QT_QPA_PLATFORM=offscreen)
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import PySide6
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QApplication, QGridLayout, QLabel, QPushButton, QWidget
+
+from counter_clean import (NumpadButton, BUTTON_HIGHLIGHT_COLOR, BUTTON_PADDING, BUTTON_SIZE,
+                           BUTTON_FONT_SIZE, BUTTON_COUNT_FONT_SIZE, BUTTON_COUNT_COLOR)
+
+KEYS = ['7', '8', '9', '4', '5', '6', '1', '2', '3', '0', '/', '*', '.']
+
+
+def legacy_default_style():
+    """이전 NumpadButton.apply_default_style의 CSS (호출마다 새로 만듦)"""
+    return f"""
+        QPushButton {{
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #4a4e69, stop:0.5 #3c4254, stop:1 #2f3542);
+            color: transparent;
+            border: 2px solid #3c4254;
+            border-radius: 12px;
+            padding: {BUTTON_PADDING}px;
+        }}
+        QPushButton:hover {{
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #5a5e79, stop:0.5 #4c5264, stop:1 #3f4552);
+            border: 2px solid #5294e2;
+        }}
+        QPushButton:pressed {{
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #2f3542, stop:0.5 #3c4254, stop:1 #4a4e69);
+        }}
+    """
+
+
+def legacy_highlight_style(color):
+    """이전 CounterApp.highlight_button의 CSS"""
+    return f"""
+        QPushButton {{
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #4a4e69, stop:0.5 #3c4254, stop:1 #2f3542);
+            color: #e0e0e0;
+            border: 3px solid {color};
+            border-radius: 12px;
+            padding: {BUTTON_PADDING}px;
+        }}
+        QPushButton:hover {{
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #5a5e79, stop:0.5 #4c5264, stop:1 #3f4552);
+            border: 3px solid {color};
+        }}
+    """
+
+
+class LegacyButton(QPushButton):
+    """이전 NumpadButton 구조 (단축키/이름/카운트/순번 자식 라벨)"""
+    def __init__(self, key, parent=None):
+        super().__init__(parent)
+        self.setFixedSize(BUTTON_SIZE, BUTTON_SIZE)
+        self.shortcut_label = QLabel(f"[{key}]", self)
+        self.shortcut_label.setGeometry(3, 3, 24, 15)
+        self.shortcut_label.setFont(QFont("맑은 고딕", 8, QFont.Bold))
+        self.name_label = QLabel(self)
+        self.name_label.setGeometry(0, 20, BUTTON_SIZE, 14)
+        self.name_label.setAlignment(Qt.AlignCenter)
+        self.name_label.setFont(QFont("맑은 고딕", BUTTON_FONT_SIZE, QFont.Bold))
+        self.name_label.setStyleSheet("background: transparent; color: #e0e0e0;")
+        self.count_label = QLabel("0", self)
+        self.count_label.setGeometry(0, 40, BUTTON_SIZE, 20)
+        self.count_label.setAlignment(Qt.AlignCenter)
+        self.count_label.setFont(QFont("맑은 고딕", BUTTON_COUNT_FONT_SIZE, QFont.Bold))
+        self.count_label.setStyleSheet(f"background: transparent; color: {BUTTON_COUNT_COLOR};")
+        self.order_label = QLabel(self)
+        self.order_label.setGeometry(BUTTON_SIZE - 25, 3, 22, 15)
+        self.order_label.setAlignment(Qt.AlignCenter)
+        self.order_label.setStyleSheet(
+            "background: rgba(255, 165, 0, 180); color: white; border-radius: 3px;")
+        self.display_name = None
+
+
+def legacy_update(button):
+    """이전 update_display의 스타일 부분 (기본 스타일 + 단축키 라벨 스타일)"""
+    button.setStyleSheet(legacy_default_style())
+    button.shortcut_label.setStyleSheet("background: transparent; color: #aaaaaa;")
+
+
+def make_grid(legacy):
+    container = QWidget()
+    grid = QGridLayout(container)
+    buttons = {}
+    for i, key in enumerate(KEYS):
+        if legacy:
+            button = LegacyButton(key, container)
+            button.name_label.setText(f"사용자{i + 1}")
+            legacy_update(button)
+        else:
+            button = NumpadButton(key, key, container)
+            button.show_user({"name": f"사용자{i + 1}", "count": 0})
+        grid.addWidget(button, i // 4, i % 4)
+        buttons[key] = button
+    container.show()
+    QApplication.processEvents()
+    return container, buttons
+
+
+def run(app, clicks, legacy):
+    container, buttons = make_grid(legacy)
+    counts = dict.fromkeys(KEYS, 0)
+    random.seed(0)
+    sequence = [random.choice(KEYS) for _ in range(clicks)]
+    last = None
+
+    start = time.perf_counter()
+    for key in sequence:
+        button = buttons[key]
+        counts[key] += 1
+        if legacy:
+            # 이전 버튼 되돌리기 → 엔진 이벤트로 다시 그리기 → 하이라이트
+            if last is not None and last is not button:
+                legacy_update(last)
+            button.count_label.setText(str(counts[key]))
+            legacy_update(button)
+            button.setStyleSheet(legacy_highlight_style(BUTTON_HIGHLIGHT_COLOR))
+        else:
+            if last is not None and last is not button:
+                last.set_highlighted(False)
+            button.show_user({"name": button.display_name, "count": counts[key]})
+            button.set_highlighted(True)
+        last = button
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    container.close()
+    return elapsed
+
+
+def main():
+    # 6.12.0은 QPainter 호출마다 None 참조가 줄어 현재 방식이 수천 번 만에 강제 종료됨
+    if PySide6.__version_info__[:2] >= (6, 12):
+        sys.exit(f"PySide6 {PySide6.__version__}은 지원하지 않습니다 "
+                 "(pip install -r requirements.txt 로 6.12 미만 설치)")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    clicks = int(args[0]) if args else 5000
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    for label, legacy in (("이전 방식 (setStyleSheet)", True), ("현재 방식 (캐시된 버튼 면)", False)):
+        elapsed = run(app, clicks, legacy)
+        print(f"{label}: 클릭 {clicks}개 {elapsed:.3f}초, 클릭당 {elapsed / clicks * 1e6:.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,26 @@ Numpad Counter - Clean Modular Design
 """
 
 import sys
-import json
 import os
 from datetime import datetime
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QGridLayout, QPushButton, QLabel,
                                QTextEdit, QFrame, QMenu, QDialog,
                                QLineEdit, QDialogButtonBox, QMessageBox, QFileDialog,
-                               QTableWidget, QTableWidgetItem, QHeaderView)
-from PySide6.QtCore import Qt, QTimer, QSharedMemory
-from PySide6.QtGui import QFont, QCursor, QKeyEvent, QIcon, QInputMethod, QColor
+                               QTableView, QHeaderView, QStyledItemDelegate, QStyle,
+                               QComboBox)
+from PySide6.QtCore import Qt, QTimer, QSharedMemory, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import (QFont, QCursor, QKeyEvent, QIcon, QInputMethod, QColor,
+                           QLinearGradient, QPainter, QPen, QPixmap, QPixmapCache)
+
+from counter_storage import (ClickJournal, BackgroundWriter, PresetStore, StorageStats,
+                             SnapshotJob, write_checkpoint, read_checkpoint,
+                             JOURNAL_FILE_NAME, CHECKPOINT_FILE_NAME, PRESET_DIR_NAME,
+                             STORAGE_STATS_FILE_NAME, SAVE_INTERVAL_MS,
+                             DURABILITY_MODE, DURABILITY_STRICT, DURABILITY_RELAXED)
+from counter_migrate import migrate_data_dir
+from counter_engine import CounterEngine, PRESET_COUNT, key_page, page_key
+from counter_history import RetentionService, open_history_store, HISTORY_RETENTION_DAYS
 
 
 # ============================================================================
@@ -28,6 +38,9 @@ GRID_SPACING = 4          # 그리드 간격
 PANEL_MARGIN = 4          # 패널 여백
 TITLE_ROW_SPACING = 6     # 타이틀 행 간격
 PRESET_BUTTON_SIZE = 30   # 프리셋 버튼 크기
+PRESET_BUTTON_MAX = 6     # 이 개수까지는 색상 버튼, 넘으면 선택 목록으로 표시
+PRESET_SELECTOR_WIDTH = 110  # 프리셋 선택 목록 너비
+KEYPAD_PAGE_COUNT = 1     # 넘패드 페이지 수 (페이지마다 13키, 2 이상이면 페이지 이동 표시)
 LOG_FONT_SIZE = 8         # 실시간 로그 폰트 크기
 TOTAL_COUNT_FONT_SIZE = 14  # 총 카운트 폰트 크기
 TOTAL_COUNT_COLOR = "#e0e0e0"  # 총 카운트 텍스트 색상
@@ -36,15 +49,60 @@ WINDOW_WIDTH_EXPANDED = 1186  # 창 너비 (히스토리 패널 펼침)
 WINDOW_HEIGHT = 580       # 창 높이
 HISTORY_PANEL_WIDTH = 780  # 히스토리 패널 너비
 
-# 프리셋 버튼 색상
+# 프리셋 버튼 색상 (선택 목록에서는 항목 앞 색상 표시, 프리셋이 더 많으면 반복)
 PRESET_COLORS = [
     "#e74c3c",  # 빨강
     "#3498db",  # 파랑
     "#2ecc71",  # 초록
+    "#f39c12",  # 주황
+    "#9b59b6",  # 보라
+    "#1abc9c",  # 청록
 ]
 
+# 넘패드 버튼 면 (상태별 그라데이션 3색, 테두리 색, 테두리 두께) - 한 번 그려 QPixmapCache에 보관
+# user: 사용자 있음, highlight: 마지막 클릭, empty: 빈 키 (비활성화 느낌),
+# disabled: setEnabled(False)된 버튼 (상태와 관계없이 이 면, 마우스 반응 없음)
+BUTTON_HIGHLIGHT_COLOR = "#2ecc71"  # 마지막 클릭 버튼 테두리 (초록색)
+BUTTON_RADIUS = 12                  # 버튼 모서리 반경
+NUMPAD_FACE_STYLES = {
+    ("user", "normal"): (("#4a4e69", "#3c4254", "#2f3542"), "#3c4254", 2),
+    ("user", "hover"): (("#5a5e79", "#4c5264", "#3f4552"), "#5294e2", 2),
+    ("user", "pressed"): (("#2f3542", "#3c4254", "#4a4e69"), "#5294e2", 2),
+    ("highlight", "normal"): (("#4a4e69", "#3c4254", "#2f3542"), BUTTON_HIGHLIGHT_COLOR, 3),
+    ("highlight", "hover"): (("#5a5e79", "#4c5264", "#3f4552"), BUTTON_HIGHLIGHT_COLOR, 3),
+    ("highlight", "pressed"): (("#5a5e79", "#4c5264", "#3f4552"), BUTTON_HIGHLIGHT_COLOR, 3),
+    ("empty", "normal"): (("#2a2e39", "#252831", "#1f2229"), "#2a2e39", 2),
+    ("empty", "hover"): (("#3a3e49", "#353841", "#2f3239"), "#4a4e59", 2),
+    ("empty", "pressed"): (("#1f2229", "#252831", "#2a2e39"), "#4a4e59", 2),
+    ("disabled", "normal"): (("#25272f", "#22242b", "#1f2127"), "#2a2c34", 2),
+}
+BUTTON_NAME_COLOR = "#e0e0e0"       # 이름 텍스트
+BUTTON_SHORTCUT_COLOR = "#aaaaaa"   # 단축키 텍스트
+BUTTON_EMPTY_TEXT_COLOR = "#666666"  # 빈 키 텍스트
+BUTTON_DISABLED_TEXT_COLOR = "#55585f"  # 비활성화된 버튼의 모든 텍스트
+BUTTON_ORDER_BADGE_COLOR = QColor(255, 165, 0, 180)  # 순번 배지 (주황, 반투명)
+
 # 히스토리 테이블 하이라이트 색상
 HISTORY_HIGHLIGHT_LATEST = "#2ecc71"   # 최신 클릭 (초록색)
+HISTORY_TEXT_COLOR = "#e0e0e0"         # 순번 텍스트
+HISTORY_ROW_HEIGHT = 24                # 행 높이 (고정, 행이 많아도 레이아웃 계산 없음)
+
+# 프리셋 선택 목록 스타일 (프리셋이 PRESET_BUTTON_MAX개를 넘을 때)
+PRESET_SELECTOR_STYLE = """
+    QComboBox {
+        background-color: #3c4254;
+        color: #e0e0e0;
+        border: 2px solid #5294e2;
+        border-radius: 4px;
+        padding: 0 6px;
+        font-weight: bold;
+    }
+    QComboBox QAbstractItemView {
+        background-color: #2a2a3e;
+        color: #e0e0e0;
+        selection-background-color: #5294e2;
+    }
+"""
 
 # QMessageBox 다크 테마 스타일
 MESSAGEBOX_DARK_STYLE = """
@@ -165,19 +223,19 @@ class UserInputDialog(QDialog):
 
 class DailyLogDialog(QDialog):
     """일자별 로그 팝업 다이얼로그"""
-    def __init__(self, data_dir, parent=None):
+    def __init__(self, history_store, parent=None):
         super().__init__(parent)
         self.setWindowTitle("일자별 로그")
         self.setModal(True)
         self.setFixedSize(400, 540)
-        self.data_dir = data_dir
+        self.history_store = history_store
         # 시스템 기본 스타일 사용 (다크모드 스타일 상속 방지)
         self.setStyleSheet("")
 
         layout = QVBoxLayout()
 
         # 상단: 안내 메시지
-        info_label = QLabel("※ 최근 90일치 로그가 자동으로 보관됩니다")
+        info_label = QLabel(f"※ 최근 {HISTORY_RETENTION_DAYS}일치 로그가 자동으로 보관됩니다")
         info_label.setStyleSheet("font-size: 9pt; padding: 5px;")  # 시스템 기본 색상 사용
         layout.addWidget(info_label)
 
@@ -202,60 +260,40 @@ class DailyLogDialog(QDialog):
         self.load_logs()
 
     def load_logs(self):
-        """일자별 로그 파일 로드 (Row별 클릭 히스토리)"""
-        history_dir = os.path.join(self.data_dir, "history")
-        if not os.path.exists(history_dir):
-            self.log_text.setPlainText("로그가 없습니다.")
-            return
+        """일자별 로그 로드 (날짜별 요약 목록만 읽음)"""
+        # 저장된 날짜별 요약 (최신순)
+        try:
+            summaries = self.history_store.day_summaries()
+        except:
+            summaries = []
 
-        # 모든 JSON 파일 찾기 (날짜 형식: YYYY-MM-DD.json)
-        log_files = []
-        for filename in os.listdir(history_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(history_dir, filename)
-                try:
-                    # 파일 수정 시간 기준으로 정렬
-                    mtime = os.path.getmtime(filepath)
-                    log_files.append((filename, filepath, mtime))
-                except:
-                    pass
-
-        if not log_files:
+        if not summaries:
             self.log_text.setPlainText("로그가 없습니다.")
             return
 
-        # 날짜 최신순으로 정렬
-        log_files.sort(key=lambda x: x[2], reverse=True)
-
         # 로그 내용 생성 (Row별 클릭 히스토리)
         log_content = []
-        for filename, filepath, _ in log_files:
-            date = filename.replace('.json', '')
+        for date, summary in summaries:
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    logs = data.get('logs', [])
-                    users = data.get('users', {})
-
-                    # 사용자별 카운트 합계
-                    total = sum(u.get('count', 0) for u in users.values())
-                    user_count = len([u for u in users.values() if u.get('count', 0) > 0])
-
-                    log_content.append(f"📅 {date}")
-                    log_content.append(f"   총 카운트: {total}회 | 사용자: {user_count}명")
-                    log_content.append("")
-
-                    # 클릭 히스토리 표시 (최근 20개만)
-                    if logs:
-                        log_content.append("   [클릭 히스토리]")
-                        for log_entry in logs[-20:]:  # 최근 20개
-                            log_content.append(f"   {log_entry}")
-                    else:
-                        log_content.append("   클릭 기록 없음")
-
-                    log_content.append("")
-                    log_content.append("-" * 50)
-                    log_content.append("")
+                logs = summary.get('recent_logs', [])
+                total = summary.get('total', 0)
+                user_count = summary.get('active_users', 0)
+
+                log_content.append(f"📅 {date}")
+                log_content.append(f"   총 카운트: {total}회 | 사용자: {user_count}명")
+                log_content.append("")
+
+                # 클릭 히스토리 표시 (요약에 담긴 최근 로그)
+                if logs:
+                    log_content.append("   [클릭 히스토리]")
+                    for log_entry in logs:
+                        log_content.append(f"   {log_entry}")
+                else:
+                    log_content.append("   클릭 기록 없음")
+
+                log_content.append("")
+                log_content.append("-" * 50)
+                log_content.append("")
             except:
                 log_content.append(f"📅 {date} (읽기 오류)")
                 log_content.append("")
@@ -268,153 +306,138 @@ class DailyLogDialog(QDialog):
 # ============================================================================
 
 class NumpadButton(QPushButton):
-    """넘패드 버튼"""
+    """넘패드 버튼
+
+    상태별 버튼 면(그라데이션, 둥근 테두리)은 한 번만 그려 QPixmapCache에 두고,
+    paintEvent에서 그 면 위에 단축키/이름/카운트/순번만 직접 그린다.
+    자식 라벨이 없으므로 카운트가 바뀌어도 이 버튼 하나만 다시 그린다.
+    """
     def __init__(self, label, shortcut_key=None, parent=None):
-        super().__init__(label, parent)
+        super().__init__(parent)
         self.key_label = label
+        self.user_key = label  # 현재 페이지에서 이 버튼이 가리키는 사용자 키
         self.shortcut_key = shortcut_key  # 단축키 (예: "7", "8", "9" 등)
-        self.user_name = None
-        self.count = 0
+        # 표시용 값 (실제 상태는 CounterEngine에 있음)
+        self.display_name = None
+        self.display_count = 0
+        self.order_num = 0
+        self.highlighted = False  # 마지막 클릭 버튼 표시
+        self.state = "empty"
 
         self.setFixedSize(BUTTON_SIZE, BUTTON_SIZE)
         self.setFont(QFont("맑은 고딕", BUTTON_FONT_SIZE, QFont.Bold))
-
-        # 단축키 표시용 라벨 (좌측 상단)
-        self.shortcut_label = QLabel(self)
-        self.shortcut_label.setGeometry(3, 3, 24, 15)
-        self.shortcut_label.setFont(QFont("맑은 고딕", 8, QFont.Bold))
-        self.shortcut_label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-        self.shortcut_label.setStyleSheet("background: transparent;")
-
-        # 이름 표시용 라벨 (중앙 상단)
-        self.name_label = QLabel(self)
-        self.name_label.setGeometry(0, 20, BUTTON_SIZE, 14)
-        self.name_label.setFont(QFont("맑은 고딕", BUTTON_FONT_SIZE, QFont.Bold))
-        self.name_label.setAlignment(Qt.AlignCenter)
-        self.name_label.setStyleSheet("background: transparent; color: #e0e0e0;")
-        self.name_label.hide()
-
-        # 카운트 표시용 라벨 (중앙 하단)
-        self.count_label = QLabel(self)
-        self.count_label.setGeometry(0, 40, BUTTON_SIZE, 20)
-        self.count_label.setFont(QFont("맑은 고딕", BUTTON_COUNT_FONT_SIZE, QFont.Bold))
-        self.count_label.setAlignment(Qt.AlignCenter)
-        self.count_label.setStyleSheet(f"background: transparent; color: {BUTTON_COUNT_COLOR};")
-        self.count_label.hide()
-
-        # 순번 표시용 라벨 (우측 상단 - 단축키 반대편)
-        self.order_label = QLabel(self)
-        self.order_label.setGeometry(BUTTON_SIZE - 25, 3, 22, 15)
-        self.order_label.setFont(QFont("맑은 고딕", 8, QFont.Bold))
-        self.order_label.setAlignment(Qt.AlignCenter)
-        self.order_label.setStyleSheet("background: rgba(255, 165, 0, 180); color: white; border-radius: 3px; padding: 1px;")
-        self.order_label.hide()
-
-        self.apply_default_style()
-
-    def apply_default_style(self):
-        """기본 스타일 적용"""
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                            stop:0 #4a4e69, stop:0.5 #3c4254, stop:1 #2f3542);
-                color: transparent;
-                border: 2px solid #3c4254;
-                border-radius: 12px;
-                padding: {BUTTON_PADDING}px;
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                            stop:0 #5a5e79, stop:0.5 #4c5264, stop:1 #3f4552);
-                border: 2px solid #5294e2;
-            }}
-            QPushButton:pressed {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                            stop:0 #2f3542, stop:0.5 #3c4254, stop:1 #4a4e69);
-            }}
-        """)
-
-    def set_user(self, name):
-        self.user_name = name
-        self.count = 0
-        self.update_display()
-
-    def clear_user(self):
-        self.user_name = None
-        self.count = 0
-        self.update_display()
-
-    def increment(self):
-        if self.user_name:
-            self.count += 1
-            self.update_display()
-            return True
-        return False
-
-    def decrement(self):
-        if self.user_name and self.count > 0:
-            self.count -= 1
-            self.update_display()
-            return True
-        return False
-
-    def reset_count(self):
-        self.count = 0
+        self.setAttribute(Qt.WA_Hover)  # 마우스 올림/내림 때 다시 그림
+        self.small_font = QFont("맑은 고딕", 8, QFont.Bold)
+        self.count_font = QFont("맑은 고딕", BUTTON_COUNT_FONT_SIZE, QFont.Bold)
+
+    def set_state(self, state):
+        """버튼 면 상태 변경 (user / highlight / empty, 바뀔 때만 다시 그림)"""
+        if self.state != state:
+            self.state = state
+            self.update()
+
+    def set_highlighted(self, highlighted):
+        """마지막 클릭 버튼 표시 켜기/끄기"""
+        self.highlighted = highlighted
+        if self.display_name:
+            self.set_state("highlight" if highlighted else "user")
+
+    def show_user(self, user):
+        """엔진의 사용자 데이터 표시 (None이면 빈 키)"""
+        self.display_name = user["name"] if user else None
+        self.display_count = user["count"] if user else 0
         self.update_display()
 
     def set_order(self, order_num):
         """순번 설정"""
-        if order_num > 0:
-            self.order_label.setText(str(order_num))
-            self.order_label.show()
-        else:
-            self.order_label.hide()
+        if order_num != self.order_num:
+            self.order_num = order_num
+            self.update()
 
     def update_display(self):
-        """버튼 텍스트 업데이트 (단축키 표시 포함)"""
-        if self.user_name:
-            # 버튼 텍스트는 비움 (라벨로 표시)
-            self.setText("")
-            self.apply_default_style()
-            # 이름 라벨 표시
-            self.name_label.setText(self.user_name)
-            self.name_label.show()
-            # 카운트 라벨 표시
-            self.count_label.setText(str(self.count))
-            self.count_label.show()
-            # 단축키 라벨 (활성)
-            if self.shortcut_key:
-                self.shortcut_label.setText(f"[{self.shortcut_key}]")
-                self.shortcut_label.setStyleSheet("background: transparent; color: #aaaaaa;")
-            else:
-                self.shortcut_label.setText("")
+        """표시 상태 갱신 (실제 그리기는 paintEvent)"""
+        if self.display_name:
+            self.state = "highlight" if self.highlighted else "user"
         else:
             # 빈 키 표시 (비활성화 느낌)
-            self.setText(f"{self.key_label}\n[빈 키]")
-            self.name_label.hide()
-            self.count_label.hide()
-            # 비활성화 스타일 적용
-            self.setStyleSheet(f"""
-                QPushButton {{
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                                stop:0 #2a2e39, stop:0.5 #252831, stop:1 #1f2229);
-                    color: #666666;
-                    border: 2px solid #2a2e39;
-                    border-radius: 12px;
-                    padding: {BUTTON_PADDING}px;
-                }}
-                QPushButton:hover {{
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                                stop:0 #3a3e49, stop:0.5 #353841, stop:1 #2f3239);
-                    border: 2px solid #4a4e59;
-                }}
-                QPushButton:pressed {{
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                                stop:0 #1f2229, stop:0.5 #252831, stop:1 #2a2e39);
-                }}
-            """)
-            # 단축키 라벨 숨김 (빈 키는 단축키 사용 안 함)
-            self.shortcut_label.setText("")
+            self.state = "empty"
+        self.update()
+
+    def face_pixmap(self):
+        """현재 상태/마우스 상태의 버튼 면 (크기별로 한 번만 그려 캐시)"""
+        state = self.state
+        if not self.isEnabled():
+            state, mode = "disabled", "normal"
+        elif self.isDown():
+            mode = "pressed"
+        elif self.underMouse():
+            mode = "hover"
+        else:
+            mode = "normal"
+        ratio = self.devicePixelRatioF()
+        width, height = self.width(), self.height()
+        cache_key = f"numpad_face:{state}:{mode}:{width}x{height}@{ratio}"
+        pixmap = QPixmapCache.find(cache_key)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+
+        stops, border_color, border_width = NUMPAD_FACE_STYLES[(state, mode)]
+        pixmap = QPixmap(int(width * ratio), int(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        gradient = QLinearGradient(0, 0, 0, height)
+        for position, color in zip((0.0, 0.5, 1.0), stops):
+            gradient.setColorAt(position, QColor(color))
+        painter.setBrush(gradient)
+        painter.setPen(QPen(QColor(border_color), border_width))
+        inset = border_width / 2
+        painter.drawRoundedRect(self.rect().adjusted(inset, inset, -inset, -inset),
+                                BUTTON_RADIUS, BUTTON_RADIUS)
+        painter.end()
+        QPixmapCache.insert(cache_key, pixmap)
+        return pixmap
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.face_pixmap())
+        width = self.width()
+        enabled = self.isEnabled()
+
+        def text_color(color):
+            return QColor(color if enabled else BUTTON_DISABLED_TEXT_COLOR)
+
+        if self.display_name:
+            # 단축키 (좌측 상단)
+            if self.shortcut_key:
+                painter.setFont(self.small_font)
+                painter.setPen(text_color(BUTTON_SHORTCUT_COLOR))
+                painter.drawText(3, 3, 24, 15, Qt.AlignLeft | Qt.AlignTop, f"[{self.shortcut_key}]")
+            # 이름 (중앙 상단)
+            painter.setFont(self.font())
+            painter.setPen(text_color(BUTTON_NAME_COLOR))
+            painter.drawText(0, 20, width, 14, Qt.AlignCenter, self.display_name)
+            # 카운트 (중앙 하단)
+            painter.setFont(self.count_font)
+            painter.setPen(text_color(BUTTON_COUNT_COLOR))
+            painter.drawText(0, 40, width, 20, Qt.AlignCenter, str(self.display_count))
+        else:
+            # 빈 키: 키 이름 + [빈 키]
+            painter.setFont(self.font())
+            painter.setPen(text_color(BUTTON_EMPTY_TEXT_COLOR))
+            painter.drawText(self.rect(), Qt.AlignCenter, f"{self.key_label}\n[빈 키]")
+
+        # 순번 배지 (우측 상단 - 단축키 반대편)
+        if self.order_num > 0:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(BUTTON_ORDER_BADGE_COLOR)
+            painter.drawRoundedRect(width - 25, 3, 22, 15, 3, 3)
+            painter.setFont(self.small_font)
+            painter.setPen(QColor("#ffffff"))
+            painter.drawText(width - 25, 3, 22, 15, Qt.AlignCenter, str(self.order_num))
+        painter.end()
 
 
 # ============================================================================
@@ -518,6 +541,7 @@ class NumpadGrid(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.buttons = {}
+        self.page = 0  # 현재 페이지 (물리 넘패드는 보이는 페이지의 키를 누름)
         self.reset_btn = None  # Reset 버튼 (원래 Num 위치)
         self.undo_btn = None  # 취소 버튼 (원래 - 위치)
         self.summary_label = None
@@ -558,7 +582,6 @@ class NumpadGrid(QWidget):
         # 0 키 (2 columns)
         btn_0 = NumpadButton('0', '0', self)
         btn_0.setFixedSize(BUTTON_SIZE * 2 + GRID_SPACING, BUTTON_SIZE)
-        btn_0.apply_default_style()
         self.buttons['0'] = btn_0
         grid.addWidget(btn_0, 4, 0, 1, 2)
 
@@ -594,6 +617,17 @@ class NumpadGrid(QWidget):
 
         self.setLayout(grid)
 
+    def set_page(self, page):
+        """페이지 전환 (버튼이 가리키는 사용자 키만 바뀜)"""
+        self.page = page
+        for label, btn in self.buttons.items():
+            btn.user_key = page_key(page, label)
+
+    def button_for(self, key):
+        """사용자 키의 버튼 (다른 페이지의 키이면 None)"""
+        page, label = key_page(key)
+        return self.buttons.get(label) if page == self.page else None
+
     def update_summary_display(self, summary_text):
         """실시간 로그 영역에 요약 표시"""
         self.summary_label.setText(summary_text if summary_text else '실시간 로그\n(카운트 없음)')
@@ -616,6 +650,122 @@ class NumpadGrid(QWidget):
             app.copy_log_to_clipboard()
 
 
+# ============================================================================
+# HISTORY TABLE MODEL
+# ============================================================================
+
+class HistoryTableModel(QAbstractTableModel):
+    """히스토리 매트릭스 모델 (열 = 사용자, 행 = 개인 카운트, 셀 = 전체 순번)
+
+    셀 값은 뷰가 그릴 때 엔진 집계값(사용자별 전체 순번 배열)에서 바로 조회하므로
+    셀마다 항목을 만들지 않고, 클릭당 메모리는 순번 배열의 4바이트뿐이다.
+    클릭 한 번은 새 행 추가(필요할 때)와 바뀐 셀/이전 하이라이트 셀 갱신만 알린다.
+    """
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.names = []     # 열 순서의 사용자 이름
+        self.columns = {}   # {이름: 열}
+        self.rows = 0
+        self.highlight = None  # 가장 최근 클릭 셀 (행, 열)
+
+    def refresh(self, page):
+        """페이지 사용자 목록부터 다시 구성 (전환, 등록/삭제, 취소 등)"""
+        self.beginResetModel()
+        self.names = self.engine.ordered_user_names(page)
+        self.columns = {name: col for col, name in enumerate(self.names)}
+        self.rows = self.engine.aggregates.max_rows(self.names) if self.names else 0
+        self.highlight = self._last_click_cell()
+        self.endResetModel()
+
+    def click_added(self):
+        """마지막 클릭 반영 (행 추가는 필요할 때만), 행을 추가했으면 True"""
+        old_highlight = self.highlight
+        self.highlight = self._last_click_cell()
+        inserted = False
+        if self.highlight is not None and self.highlight[0] >= self.rows:
+            row = self.highlight[0]
+            self.beginInsertRows(QModelIndex(), self.rows, row)
+            self.rows = row + 1
+            self.endInsertRows()
+            inserted = True
+        for cell in (old_highlight, self.highlight):
+            if cell is not None and cell[0] < self.rows:
+                index = self.index(*cell)
+                self.dataChanged.emit(index, index)
+        return inserted
+
+    def _last_click_cell(self):
+        click_history = self.engine.click_history
+        if not click_history:
+            return None
+        name, count = click_history[-1]
+        col = self.columns.get(name)
+        return (count - 1, col) if col is not None and count > 0 else None
+
+    def order_at(self, row, col):
+        """셀의 전체 순번 (이 사용자의 row + 1번째 클릭, 없으면 0)"""
+        return self.engine.aggregates.order_of(self.names[col], row + 1)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        # 화면에는 HistoryCellDelegate가 직접 그림 (복사/접근성용 텍스트만 제공)
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        order = self.order_at(index.row(), index.column())
+        return str(order) if order else None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.names[section] if section < len(self.names) else None
+        return str(section + 1)
+
+
+class HistoryCellDelegate(QStyledItemDelegate):
+    """히스토리 셀 그리기 (전체 순번 숫자와 최근 클릭 하이라이트를 직접 그림)
+
+    스타일 옵션 초기화나 역할별 데이터 조회 없이 숫자 하나만 그리고,
+    빈 셀은 아무것도 그리지 않는다.
+    """
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.text_color = QColor(HISTORY_TEXT_COLOR)
+        self.highlight_font = QFont("맑은 고딕", 9, QFont.Bold)
+        self.highlight_color = QColor(HISTORY_HIGHLIGHT_LATEST)
+        self.highlight_text_color = QColor("#ffffff")
+
+    def paint(self, painter, option, index):
+        row, col = index.row(), index.column()
+        highlighted = self.model.highlight == (row, col)
+        selected = bool(option.state & QStyle.State_Selected)
+        order = self.model.order_at(row, col)
+        if not order and not selected:
+            return
+
+        painter.save()
+        if highlighted:
+            # 가장 최근 클릭: 볼드, 초록 배경, 흰 글자
+            painter.fillRect(option.rect, self.highlight_color)
+            painter.setFont(self.highlight_font)
+            painter.setPen(self.highlight_text_color)
+        else:
+            if selected:
+                painter.fillRect(option.rect, option.palette.highlight())
+            painter.setFont(option.font)
+            painter.setPen(self.text_color)
+        if order:
+            painter.drawText(option.rect, Qt.AlignCenter, str(order))
+        painter.restore()
+
+
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
@@ -647,33 +797,53 @@ class CounterApp(QMainWindow):
         self.history_dir = os.path.join(self.data_dir, "history")
         os.makedirs(self.history_dir, exist_ok=True)
 
-        self.presets_file = os.path.join(self.data_dir, "presets.json")
-        self.counter_data_file = os.path.join(self.data_dir, "counter_data.json")
+        # 이전 형식 데이터는 처음 한 번만 현재 형식으로 변환 (이후 시작에서는 현재 형식만 읽음)
+        migrate_data_dir(self.data_dir)
+        self.checkpoint_file = os.path.join(self.data_dir, CHECKPOINT_FILE_NAME)
+        # 프리셋별 파일 (처음 사용할 때 로드, 바뀐 프리셋만 저장)
+        self.preset_store = PresetStore(os.path.join(self.data_dir, PRESET_DIR_NAME))
+
+        # 일자별 히스토리 저장소 (JSON 디렉토리 또는 SQLite)
+        self.history_store = open_history_store(self.data_dir)
+        # 보관 기간/용량 정리 (시작 시와 날짜 변경 시에만 전용 스레드에서 실행)
+        self.retention = RetentionService(self.history_store)
+        self.retention.request()
 
-        # State
-        self.presets = [{"name": f"프리셋 {i+1}", "users": {}, "click_history": []} for i in range(3)]
-        self.current_preset = 0
-        self.logs = []
-        self.click_history = []  # 클릭 순서 기록 [(name, count), ...]
-        self.last_date = datetime.now().strftime("%Y-%m-%d")
+        # 내구성 모드와 저장 통계 (fsync 횟수, 기록 바이트)
+        self.durability_mode = DURABILITY_MODE
+        self.storage_stats = StorageStats(self.durability_mode)
+
+        # 클릭 저널 (클릭마다 한 줄 추가, 전체 저장은 백그라운드 스레드에서)
+        self.journal = ClickJournal(os.path.join(self.data_dir, JOURNAL_FILE_NAME),
+                                    fsync_each=self.durability_mode == DURABILITY_STRICT,
+                                    stats=self.storage_stats)
+        self.writer = BackgroundWriter()
+        self.last_error_text = None  # 마지막으로 알린 저장 오류 (같은 메시지 반복 방지)
+
+        # 카운터 상태와 로직 (Qt 없음, GUI는 변경 이벤트를 받아 화면만 갱신)
+        self.engine = CounterEngine(self.preset_store, self.journal)
 
         # UI Setup
         self.init_ui()
         self.apply_global_styles()
+        self.engine.add_listener(self.on_engine_change)
 
         # Load data and start timer
+        # (화면 갱신과 히스토리 테이블 초기 로드는 엔진의 "load" 이벤트에서)
         self.load_data()
-        # update_summary()는 load_current_preset()에서 호출됨
-
-        # 히스토리 테이블 초기 로드 (히스토리 패널이 펼쳐진 상태이므로)
-        if self.history_panel_visible and self.click_history:
-            self.update_history_table()
 
         # Daily reset timer
         self.check_timer = QTimer()
         self.check_timer.timeout.connect(self.check_daily_reset)
         self.check_timer.start(60000)
 
+        # 변경 사항 주기적 저장 타이머 (간격 내 변경은 한 번으로 합쳐짐)
+        # relaxed 모드는 종료/날짜 변경 시에만 저장
+        self.save_timer = QTimer()
+        self.save_timer.timeout.connect(self.save_data)
+        if self.durability_mode != DURABILITY_RELAXED:
+            self.save_timer.start(SAVE_INTERVAL_MS)
+
         # Num Lock 상태 체크 타이머
         self.numlock_timer = QTimer()
         self.numlock_timer.timeout.connect(self.check_numlock_state)
@@ -728,35 +898,12 @@ class CounterApp(QMainWindow):
             pass
 
     def undo_last_click(self):
-        """최근 클릭 취소 (Ctrl+Z 효과)"""
-        if not self.click_history:
-            self.add_log("[취소] 되돌릴 작업이 없습니다")
-            return
+        """최근 작업 취소 (클릭, 등록, 수정, 삭제, 초기화 - 여러 단계 가능)"""
+        self.engine.undo()
 
-        # 마지막 클릭 가져오기
-        last_name, last_count = self.click_history.pop()
-
-        # 해당 사용자의 버튼 찾기
-        target_button = None
-        for btn in self.numpad.buttons.values():
-            if btn.user_name == last_name and btn.count == last_count:
-                target_button = btn
-                break
-
-        if target_button:
-            # 카운트 감소
-            target_button.count -= 1
-            target_button.update_display()
-            self.add_log(f"[취소] {target_button.key_label}: {last_name} (총 {target_button.count}회)")
-
-            # 저장 및 업데이트
-            self.save_data()
-            self.save_daily_history()
-            self.update_summary()
-
-            # 히스토리 패널이 열려있으면 업데이트
-            if self.history_panel_visible:
-                self.update_history_table()
+    def redo_last_undo(self):
+        """취소한 작업 다시 실행"""
+        self.engine.redo()
 
     def keyPressEvent(self, event):
         """키보드 입력 처리"""
@@ -767,6 +914,20 @@ class CounterApp(QMainWindow):
             self.undo_last_click()
             return
 
+        # + 키 처리 (다시 실행)
+        if key_text == '+':
+            self.redo_last_undo()
+            return
+
+        # Enter / Page Down: 다음 페이지, Page Up: 이전 페이지
+        if KEYPAD_PAGE_COUNT > 1:
+            if event.key() in (Qt.Key_Enter, Qt.Key_Return, Qt.Key_PageDown):
+                self.switch_page(self.numpad.page + 1)
+                return
+            if event.key() == Qt.Key_PageUp:
+                self.switch_page(self.numpad.page - 1)
+                return
+
         # 숫자 및 기호 키 매핑
         key_map = {
             '0': '0', '1': '1', '2': '2', '3': '3', '4': '4',
@@ -780,7 +941,7 @@ class CounterApp(QMainWindow):
             if button_key in self.numpad.buttons:
                 button = self.numpad.buttons[button_key]
                 # 사용자가 할당된 버튼만 단축키로 작동
-                if button.user_name:
+                if self.engine.user(button.user_key):
                     button.click()
 
         super().keyPressEvent(event)
@@ -845,39 +1006,81 @@ class CounterApp(QMainWindow):
         title_layout = QHBoxLayout()
         title_layout.setSpacing(TITLE_ROW_SPACING)
 
-        # Preset buttons (left) - 정사각형 컬러 버튼
+        # Preset selector (left) - 정사각형 컬러 버튼, 많으면 선택 목록 (창 너비 고정)
         self.preset_buttons = []
-        for i in range(3):
-            btn = QPushButton()
-            btn.setFixedSize(PRESET_BUTTON_SIZE, PRESET_BUTTON_SIZE)
-            btn.setCheckable(True)
-            color = PRESET_COLORS[i]
-            btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {color};
-                    border: 2px solid {color};
-                    border-radius: 4px;
-                }}
-                QPushButton:hover {{
-                    border: 2px solid #ffffff;
-                }}
-                QPushButton:checked {{
-                    border: 3px solid #ffffff;
-                }}
-            """)
-            btn.clicked.connect(lambda checked=False, idx=i: self.switch_preset(idx))
-            self.preset_buttons.append(btn)
-            title_layout.addWidget(btn)
+        self.preset_selector = None
+        if PRESET_COUNT > PRESET_BUTTON_MAX:
+            self.preset_selector = QComboBox()
+            self.preset_selector.setFixedSize(PRESET_SELECTOR_WIDTH, PRESET_BUTTON_SIZE)
+            self.preset_selector.setStyleSheet(PRESET_SELECTOR_STYLE)
+            self.preset_selector.setMaxVisibleItems(12)
+            # 넘패드 단축키가 목록으로 가지 않도록 포커스를 받지 않음
+            self.preset_selector.setFocusPolicy(Qt.NoFocus)
+            for i in range(PRESET_COUNT):
+                self.preset_selector.addItem(f"프리셋 {i + 1}")
+                self.preset_selector.setItemData(
+                    i, QColor(PRESET_COLORS[i % len(PRESET_COLORS)]), Qt.DecorationRole)
+            self.preset_selector.activated.connect(self.switch_preset)
+            title_layout.addWidget(self.preset_selector)
+        else:
+            for i in range(PRESET_COUNT):
+                btn = QPushButton()
+                btn.setFixedSize(PRESET_BUTTON_SIZE, PRESET_BUTTON_SIZE)
+                btn.setCheckable(True)
+                color = PRESET_COLORS[i % len(PRESET_COLORS)]
+                btn.setStyleSheet(f"""
+                    QPushButton {{
+                        color: #ffffff;
+                        font-weight: bold;
+                        background-color: {color};
+                        border: 2px solid {color};
+                        border-radius: 4px;
+                    }}
+                    QPushButton:hover {{
+                        border: 2px solid #ffffff;
+                    }}
+                    QPushButton:checked {{
+                        border: 3px solid #ffffff;
+                    }}
+                """)
+                btn.clicked.connect(lambda checked=False, idx=i: self.switch_preset(idx))
+                self.preset_buttons.append(btn)
+                title_layout.addWidget(btn)
 
         title_layout.addStretch()
 
+        # Page buttons (페이지가 여러 개일 때만)
+        self.page_label = None
+        if KEYPAD_PAGE_COUNT > 1:
+            prev_page_btn = QPushButton("◀")
+            prev_page_btn.setFixedSize(PRESET_BUTTON_SIZE, PRESET_BUTTON_SIZE)
+            prev_page_btn.setStyleSheet("padding: 0px;")
+            prev_page_btn.clicked.connect(lambda: self.switch_page(self.numpad.page - 1))
+            title_layout.addWidget(prev_page_btn)
+
+            self.page_label = QLabel(f"1/{KEYPAD_PAGE_COUNT}")
+            self.page_label.setFont(QFont("맑은 고딕", 10, QFont.Bold))
+            self.page_label.setAlignment(Qt.AlignCenter)
+            self.page_label.setMinimumWidth(self.page_label.fontMetrics().horizontalAdvance(
+                f"{KEYPAD_PAGE_COUNT}/{KEYPAD_PAGE_COUNT}") + 8)
+            title_layout.addWidget(self.page_label)
+
+            next_page_btn = QPushButton("▶")
+            next_page_btn.setFixedSize(PRESET_BUTTON_SIZE, PRESET_BUTTON_SIZE)
+            next_page_btn.setStyleSheet("padding: 0px;")
+            next_page_btn.clicked.connect(lambda: self.switch_page(self.numpad.page + 1))
+            title_layout.addWidget(next_page_btn)
+
         # Total count label (right)
         self.total_count_label = QLabel("총: 0")
         self.total_count_label.setFont(QFont("맑은 고딕", TOTAL_COUNT_FONT_SIZE, QFont.Bold))
         self.total_count_label.setStyleSheet(f"color: {TOTAL_COUNT_COLOR}; padding: 0 10px;")
+        self.total_count_label.setMinimumWidth(
+            self.total_count_label.fontMetrics().horizontalAdvance("총: 00000") + 20)
         title_layout.addWidget(self.total_count_label)
 
-        self.preset_buttons[0].setChecked(True)
+        if self.preset_buttons:
+            self.preset_buttons[0].setChecked(True)
         layout.addLayout(title_layout)
 
         # Numpad grid
@@ -934,16 +1137,33 @@ class CounterApp(QMainWindow):
         layout = QVBoxLayout()
         layout.setContentsMargins(10, 10, 10, 10)
 
-        # 테이블 (동적 컬럼)
-        self.history_table = QTableWidget()
+        # 테이블 (모델/뷰, 셀 값은 엔진에서 바로 조회)
+        self.history_model = HistoryTableModel(self.engine, self)
+        self.history_table = QTableView()
+        self.history_table.setModel(self.history_model)
         self.history_table.setFont(QFont("맑은 고딕", 9))
 
+        # 컬럼 드래그로 순서 변경 가능, 모든 컬럼 균등 분배
+        header = self.history_table.horizontalHeader()
+        header.setSectionsMovable(True)
+        header.setDragEnabled(True)
+        header.setDragDropMode(QHeaderView.InternalMove)
+        header.setSectionResizeMode(QHeaderView.Stretch)
+
+        # 셀은 델리게이트가 직접 그리고, 행 높이는 고정 (행 수와 무관한 레이아웃)
+        self.history_delegate = HistoryCellDelegate(self.history_model, self)
+        self.history_table.setItemDelegate(self.history_delegate)
+        self.history_table.setWordWrap(False)
+        rows_header = self.history_table.verticalHeader()
+        rows_header.setSectionResizeMode(QHeaderView.Fixed)
+        rows_header.setDefaultSectionSize(HISTORY_ROW_HEIGHT)
+
         # 행 번호(vertical header) 가운데 정렬
         self.history_table.verticalHeader().setDefaultAlignment(Qt.AlignCenter)
 
         # 스타일
         self.history_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #2a2a3e;
                 color: #e0e0e0;
                 gridline-color: #3c4254;
@@ -956,7 +1176,7 @@ class CounterApp(QMainWindow):
                 border: 1px solid #2a2a3e;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
         """)
@@ -990,117 +1210,26 @@ class CounterApp(QMainWindow):
             self.update_history_table()
 
     def update_history_table(self):
-        """히스토리 테이블 업데이트 (매트릭스 형태)"""
-        # 등록된 사용자 목록 가져오기 (등록 순서대로)
-        users_with_order = []
-        for key, btn in self.numpad.buttons.items():
-            if btn.user_name:
-                order = btn.register_order if hasattr(btn, 'register_order') else 0
-                users_with_order.append((btn.user_name, order))
-
-        # 등록된 사용자가 없으면 테이블 초기화
-        if not users_with_order:
-            self.history_table.setRowCount(0)
-            self.history_table.setColumnCount(0)
-            return
-
-        # 등록 순서로 정렬하고 중복 제거
-        users_with_order.sort(key=lambda x: x[1])
-        user_names = []
-        for name, _ in users_with_order:
-            if name not in user_names:
-                user_names.append(name)
-
-        # 컬럼 설정: 각 사용자 이름만
-        headers = user_names
-        self.history_table.setColumnCount(len(headers))
-        self.history_table.setHorizontalHeaderLabels(headers)
-
-        # 컬럼 드래그로 순서 변경 가능하도록 설정
-        self.history_table.horizontalHeader().setSectionsMovable(True)
-        self.history_table.horizontalHeader().setDragEnabled(True)
-        self.history_table.horizontalHeader().setDragDropMode(QHeaderView.InternalMove)
-
-        # 각 사용자의 최대 클릭 횟수 계산
-        max_count = {}
-        for name, count in self.click_history:
-            if name not in max_count or count > max_count[name]:
-                max_count[name] = count
-
-        # 행 개수 = 최대 카운트
-        max_rows = max(max_count.values()) if max_count else 0
-        self.history_table.setRowCount(max_rows)
-
-        # 각 사용자별 클릭을 개인 카운트 -> 전체 순번 매핑
-        user_clicks = {}  # {name: {personal_count: global_order}}
-        for global_order, (name, personal_count) in enumerate(self.click_history, 1):
-            if name not in user_clicks:
-                user_clicks[name] = {}
-            user_clicks[name][personal_count] = global_order
-
-        # 가장 최근 클릭 찾기 (마지막 항목만)
-        last_click = None
-        if self.click_history:
-            last_name, last_count = self.click_history[-1]
-            last_click = (last_name, last_count)
-
-        # 테이블 채우기
-        for row in range(max_rows):
-            personal_count = row + 1  # 개인 카운트 (1, 2, 3...)
-
-            # 각 사용자 컬럼
-            for col, user_name in enumerate(user_names):
-                if user_name in user_clicks and personal_count in user_clicks[user_name]:
-                    # 이 사용자의 personal_count번째 클릭의 전체 순번
-                    global_order = user_clicks[user_name][personal_count]
-                    item = QTableWidgetItem(str(global_order))
-                    item.setTextAlignment(Qt.AlignCenter)
-
-                    # 가장 최근 클릭인 경우 하이라이트
-                    if last_click and user_name == last_click[0] and personal_count == last_click[1]:
-                        # 볼드 폰트 적용
-                        font = item.font()
-                        font.setBold(True)
-                        item.setFont(font)
-                        # 배경색 적용
-                        item.setBackground(QColor(HISTORY_HIGHLIGHT_LATEST))
-                        # 텍스트 색상 (흰색)
-                        item.setForeground(QColor("#ffffff"))
-
-                    self.history_table.setItem(row, col, item)
-                else:
-                    # 빈 셀
-                    item = QTableWidgetItem("")
-                    item.setTextAlignment(Qt.AlignCenter)
-                    self.history_table.setItem(row, col, item)
-
-        # 컬럼 너비 자동 조정 (모든 컬럼 균등 분배)
-        header = self.history_table.horizontalHeader()
-        for col in range(len(headers)):
-            header.setSectionResizeMode(col, QHeaderView.Stretch)
-
+        """히스토리 테이블 다시 구성 (보이는 페이지의 사용자, 매트릭스 형태)"""
+        self.history_model.refresh(self.numpad.page)
         # 스크롤을 맨 아래로
-        if max_rows > 0:
+        if self.history_model.rows > 0:
             self.history_table.scrollToBottom()
 
     def show_log_dialog(self):
         """일자별 로그 팝업 표시"""
-        dialog = DailyLogDialog(self.data_dir, self)
+        # 오늘 기록이 파일에 반영되도록 먼저 저장
+        self.save_data(wait=True)
+        dialog = DailyLogDialog(self.history_store, self)
         dialog.exec()
 
     def copy_log_to_clipboard(self):
         """실시간 로그 영역 클릭 시 현재 카운트 클립보드 복사"""
-        # 카운트가 있는 사용자만 수집하여 높은 순으로 정렬
-        user_counts = []
-        for key in self.numpad.buttons.keys():
-            btn = self.numpad.buttons[key]
-            if btn.user_name and btn.count > 0:
-                user_counts.append((btn.user_name, btn.count))
-
-        user_counts.sort(key=lambda x: x[1], reverse=True)
+        # 실시간 로그와 같은 요약 사용 (카운트가 있는 사용자, 높은 순)
+        summary = self.engine.summary()
 
         # 실시간 로그에 정보가 있을 경우에만 복사
-        if not user_counts:
+        if not summary.leaderboard:
             msg = QMessageBox(self)
             msg.setIcon(QMessageBox.Information)
             msg.setWindowTitle("복사 실패")
@@ -1109,20 +1238,7 @@ class CounterApp(QMainWindow):
             msg.exec()
             return
 
-        summary_lines = []
-        summary_lines.append(f"=== {datetime.now().strftime('%Y-%m-%d')} 카운터 결과 ===")
-        summary_lines.append("")
-
-        for name, count in user_counts:
-            summary_lines.append(f"{name}: {count}회")
-
-        # 총합 계산 및 추가
-        total = sum(count for name, count in user_counts)
-        summary_lines.append("")
-        summary_lines.append(f"총합: {total}회")
-
-        text = "\n".join(summary_lines)
-        QApplication.clipboard().setText(text)
+        QApplication.clipboard().setText(summary.clipboard_text())
 
         # 간단한 피드백 메시지
         msg = QMessageBox(self)
@@ -1167,49 +1283,28 @@ class CounterApp(QMainWindow):
     # ========================================================================
 
     def on_button_click(self, button):
-        """버튼 클릭 처리 (모드 토글 버튼에 따라 증가/감소)"""
-        if not button.user_name:
+        """버튼 클릭 처리 (빈 키는 사용자 등록, 사용자가 있는 키는 증가)"""
+        key = button.user_key
+        if self.engine.user(key) is None:
             # 빈 키 - 사용자 등록
             self.register_user(button)
         else:
             # 이전 버튼의 하이라이트 제거
             if self.last_clicked_button and self.last_clicked_button != button:
-                self.last_clicked_button.update_display()
+                self.last_clicked_button.set_highlighted(False)
 
-            # 사용자가 있는 키 - 항상 증가
-            if button.increment():
-                self.add_log(f"[+] {button.key_label}: {button.user_name} (총 {button.count}회)")
-                # 클릭 순서 기록 추가
-                self.click_history.append((button.user_name, button.count))
-                # 증가 시 초록색 하이라이트
-                self.highlight_button(button, "#2ecc71")
+            # 사용자가 있는 키 - 항상 증가 (화면 갱신은 엔진 이벤트에서)
+            if self.engine.increment(key) is not None:
+                # 증가 시 초록색 하이라이트 (같은 버튼을 계속 누르면 스타일 변경 없음)
+                button.set_highlighted(True)
 
             self.last_clicked_button = button
-            self.save_data()
-            self.save_daily_history()  # 매번 자동 저장
-            self.update_summary()
 
-            # 히스토리 패널이 열려있으면 업데이트
-            if self.history_panel_visible:
-                self.update_history_table()
-
-    def highlight_button(self, button, color):
-        """마지막 클릭한 버튼을 하이라이트"""
-        button.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                            stop:0 #4a4e69, stop:0.5 #3c4254, stop:1 #2f3542);
-                color: #e0e0e0;
-                border: 3px solid {color};
-                border-radius: 12px;
-                padding: {BUTTON_PADDING}px;
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                            stop:0 #5a5e79, stop:0.5 #4c5264, stop:1 #3f4552);
-                border: 3px solid {color};
-            }}
-        """)
+    def clear_highlight(self):
+        """마지막 클릭 버튼 하이라이트 해제"""
+        if self.last_clicked_button:
+            self.last_clicked_button.set_highlighted(False)
+            self.last_clicked_button = None
 
     def register_user(self, button):
         """사용자 등록"""
@@ -1218,7 +1313,7 @@ class CounterApp(QMainWindow):
             name = dialog.get_name()
             if name:
                 # 중복 이름 체크
-                if self.is_duplicate_name(name, button):
+                if self.engine.is_duplicate_name(name, button.user_key):
                     msg = QMessageBox(self)
                     msg.setIcon(QMessageBox.Warning)
                     msg.setWindowTitle("중복 오류")
@@ -1227,29 +1322,11 @@ class CounterApp(QMainWindow):
                     msg.exec()
                     return
 
-                button.set_user(name)
-                # 등록 순서 부여 (현재 프리셋에서 가장 큰 order + 1)
-                max_order = 0
-                for btn in self.numpad.buttons.values():
-                    if hasattr(btn, 'register_order') and btn != button:
-                        max_order = max(max_order, btn.register_order)
-                button.register_order = max_order + 1
-
-                self.add_log(f"[등록] {button.key_label}: '{name}' 등록됨")
-                self.save_data()
-                self.update_summary()
-                self.update_history_table()
-
-    def is_duplicate_name(self, name, current_button):
-        """다른 버튼에 같은 이름이 있는지 확인"""
-        for btn in self.numpad.buttons.values():
-            if btn != current_button and btn.user_name == name:
-                return True
-        return False
+                self.engine.register_user(button.user_key, name)
 
     def show_button_menu(self, button, pos):
         """우클릭 메뉴"""
-        if not button.user_name:
+        if self.engine.user(button.user_key) is None:
             return
 
         menu = QMenu(self)
@@ -1265,12 +1342,12 @@ class CounterApp(QMainWindow):
 
     def modify_user(self, button):
         """사용자 수정"""
-        dialog = UserInputDialog(self, "사용자 수정", button.user_name)
+        dialog = UserInputDialog(self, "사용자 수정", self.engine.user(button.user_key)["name"])
         if dialog.exec() == QDialog.Accepted:
             new_name = dialog.get_name()
             if new_name:
                 # 중복 이름 체크 (자신 제외)
-                if self.is_duplicate_name(new_name, button):
+                if self.engine.is_duplicate_name(new_name, button.user_key):
                     msg = QMessageBox(self)
                     msg.setIcon(QMessageBox.Warning)
                     msg.setWindowTitle("중복 오류")
@@ -1279,140 +1356,88 @@ class CounterApp(QMainWindow):
                     msg.exec()
                     return
 
-                old_name = button.user_name
                 # 이름 변경 시 카운트를 0으로 리셋 (새로운 사용자로 간주)
-                button.user_name = new_name
-                button.count = 0
-                button.update_display()
-                self.add_log(f"[수정] {button.key_label}: '{old_name}' → '{new_name}' (카운트 초기화)")
-                self.save_data()
-                self.update_summary()
+                self.engine.modify_user(button.user_key, new_name)
 
     def delete_user(self, button):
         """사용자 삭제"""
         msg = QMessageBox(self)
         msg.setIcon(QMessageBox.Question)
         msg.setWindowTitle("확인")
-        msg.setText(f"'{button.user_name}'을(를) 삭제하시겠습니까?")
+        msg.setText(f"'{self.engine.user(button.user_key)['name']}'을(를) 삭제하시겠습니까?")
         msg.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
         msg.setDefaultButton(QMessageBox.No)
         msg.setStyleSheet(MESSAGEBOX_DARK_STYLE)
         reply = msg.exec()
 
         if reply == QMessageBox.Yes:
-            old_name = button.user_name
-            button.clear_user()
-            self.add_log(f"[삭제] {button.key_label}: '{old_name}' 삭제됨")
-            self.save_data()
-            self.update_summary()
+            self.engine.delete_user(button.user_key)
 
     # ========================================================================
     # PRESET MANAGEMENT
     # ========================================================================
 
     def switch_preset(self, index):
-        if index == self.current_preset:
-            return
+        self.engine.switch_preset(index)
 
-        self.save_current_preset()
-        self.current_preset = index
-
-        for i, btn in enumerate(self.preset_buttons):
-            btn.setChecked(i == index)
+    def switch_page(self, page):
+        """넘패드 페이지 전환 (마지막 페이지 다음은 첫 페이지)"""
+        page %= KEYPAD_PAGE_COUNT
+        if page == self.numpad.page:
+            return
+        self.numpad.set_page(page)
+        self.page_label.setText(f"{page + 1}/{KEYPAD_PAGE_COUNT}")
+        self.on_engine_change("page", None)
+
+    def on_engine_change(self, event, key):
+        """엔진 변경 이벤트 → 버튼/요약/히스토리 테이블 갱신"""
+        # 클릭 외의 변경은 마지막 클릭 하이라이트 해제 (해당 버튼이거나 전체 갱신일 때)
+        if event != "inc" and (key is None or (self.last_clicked_button is not None
+                                                and self.last_clicked_button.user_key == key)):
+            self.clear_highlight()
+
+        if key is None:
+            # 프리셋 전체가 바뀜 (전환, 로드, 초기화, 날짜 변경)
+            for i, btn in enumerate(self.preset_buttons):
+                btn.setChecked(i == self.engine.current_preset)
+            if self.preset_selector is not None:
+                self.preset_selector.setCurrentIndex(self.engine.current_preset)
+            for btn in self.numpad.buttons.values():
+                btn.show_user(self.engine.user(btn.user_key))
+        else:
+            # 보이는 페이지의 키만 갱신
+            btn = self.numpad.button_for(key)
+            if btn is not None:
+                btn.show_user(self.engine.user(key))
 
-        self.load_current_preset()
-        self.add_log(f"[프리셋] 프리셋 {index + 1}로 전환")
         self.update_summary()
 
-        # 히스토리 패널이 열려있으면 업데이트
+        # 히스토리 패널이 열려있으면 업데이트 (클릭은 바뀐 셀만)
         if self.history_panel_visible:
-            self.update_history_table()
-
-    def save_current_preset(self):
-        preset_data = {}
-        for key, btn in self.numpad.buttons.items():
-            if btn.user_name:
-                preset_data[key] = {
-                    "name": btn.user_name,
-                    "count": btn.count,
-                    "order": btn.register_order if hasattr(btn, 'register_order') else 0
-                }
-        self.presets[self.current_preset]["users"] = preset_data
-        self.presets[self.current_preset]["click_history"] = self.click_history
-
-    def load_current_preset(self):
-        """현재 프리셋 데이터를 버튼에 로드"""
-        # numpad가 아직 생성되지 않았으면 리턴
-        if not hasattr(self, 'numpad') or self.numpad is None:
-            return
-
-        for btn in self.numpad.buttons.values():
-            btn.clear_user()
-
-        preset_data = self.presets[self.current_preset]["users"]
-        for key, data in preset_data.items():
-            if key in self.numpad.buttons:
-                btn = self.numpad.buttons[key]
-                btn.set_user(data["name"])
-                btn.count = data.get("count", 0)
-                btn.register_order = data.get("order", 0)
-                btn.update_display()
-
-        # 클릭 히스토리 복원
-        self.click_history = self.presets[self.current_preset].get("click_history", [])
-
-        # 로드 후 요약 업데이트
-        self.update_summary()
+            if event == "inc":
+                if self.history_model.click_added():
+                    self.history_table.scrollToBottom()
+            else:
+                self.update_history_table()
 
     # ========================================================================
     # SUMMARY AND LOG
     # ========================================================================
 
-    def add_log(self, message):
-        """로그 추가 (메모리만, 화면 표시 없음)"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        self.logs.append(log_entry)
-
     def update_summary(self):
         """요약 업데이트 (실시간 로그 영역에 클릭 순서대로 표시)"""
-        # 총 카운트 계산
-        total_count = 0
-        for key in self.numpad.buttons.keys():
-            btn = self.numpad.buttons[key]
-            if btn.user_name and btn.count > 0:
-                total_count += btn.count
+        summary = self.engine.summary()
 
         # 총 카운트 라벨 업데이트
-        self.total_count_label.setText(f"총: {total_count}")
-
-        # 각 버튼의 마지막 순번 업데이트
-        last_order = {}  # {name: order_number}
-        for i, (name, count) in enumerate(self.click_history):
-            last_order[name] = i + 1
+        self.total_count_label.setText(f"총: {summary.total}")
 
-        for key in self.numpad.buttons.keys():
-            btn = self.numpad.buttons[key]
-            if btn.user_name and btn.user_name in last_order:
-                btn.set_order(last_order[btn.user_name])
-            else:
-                btn.set_order(0)
-
-        # 사용자별 카운트를 모아서 개수가 많은 순서로 정렬
-        user_counts = []
-        for key in sorted(self.numpad.buttons.keys()):
-            btn = self.numpad.buttons[key]
-            if btn.user_name and btn.count > 0:
-                user_counts.append((btn.user_name, btn.count))
-
-        # 카운트가 많은 순서로 정렬 (내림차순)
-        user_counts.sort(key=lambda x: x[1], reverse=True)
+        # 각 버튼의 마지막 순번 업데이트 (보이는 페이지만)
+        for btn in self.numpad.buttons.values():
+            user = self.engine.user(btn.user_key)
+            btn.set_order(self.engine.last_order(user["name"]) if user else 0)
 
-        if user_counts:
-            display_lines = [f"{name}: {count}회" for name, count in user_counts]
-            display_text = "\n".join(display_lines)
-        else:
-            display_text = "실\n시\n간\n로\n그\n"
+        # 사용자별 카운트 (개수가 많은 순서, 요약에 한 번만 만들어 둠)
+        display_text = summary.display_text() or "실\n시\n간\n로\n그\n"
 
         self.numpad.update_summary_display(display_text)
 
@@ -1431,37 +1456,18 @@ class CounterApp(QMainWindow):
         reply = msg.exec()
 
         if reply == QMessageBox.Yes:
-            # 버튼 카운트 리셋
-            for btn in self.numpad.buttons.values():
-                btn.reset_count()
-
-            # presets.json의 count만 0으로 리셋 (이름은 유지)
-            for key in self.presets[self.current_preset]["users"]:
-                self.presets[self.current_preset]["users"][key]["count"] = 0
-
-            # 클릭 히스토리 초기화
-            self.click_history.clear()
-
-            self.add_log("[초기화] 모든 카운터 초기화됨")
-            self.save_data()
-            self.update_summary()
-
-            # 히스토리 패널이 열려있으면 업데이트
-            if self.history_panel_visible:
-                self.update_history_table()
+            # 카운트와 클릭 히스토리 초기화 (이름은 유지)
+            self.engine.reset_counts()
 
     def check_daily_reset(self):
         today = datetime.now().strftime("%Y-%m-%d")
-        if today != self.last_date:
-            self.save_today_history()
-            for btn in self.numpad.buttons.values():
-                btn.reset_count()
-            self.logs.clear()
-            self.click_history.clear()  # 클릭 히스토리도 초기화
-            self.last_date = today
-            self.add_log("[자동] 날짜가 변경되어 카운터가 초기화되었습니다")
-            self.save_data()
-            self.update_summary()
+        if today != self.engine.last_date:
+            # 지난 날짜의 기록을 히스토리에 확실히 저장 (클릭 이벤트 포함)
+            self.engine.dirty = True
+            self.save_data(wait=True, day_end=True)
+            self.engine.start_new_day(today)
+            self.save_data(wait=True)
+            self.retention.request()
 
     # ========================================================================
     # EXPORT
@@ -1474,23 +1480,8 @@ class CounterApp(QMainWindow):
         )
 
         if filename:
-            summary_lines = []
-            summary_lines.append(f"=== {datetime.now().strftime('%Y-%m-%d')} 카운터 결과 ===")
-            summary_lines.append("")
-
-            total = 0
-            for key in sorted(self.numpad.buttons.keys()):
-                btn = self.numpad.buttons[key]
-                if btn.user_name:
-                    summary_lines.append(f"{btn.user_name}: {btn.count}회")
-                    total += btn.count
-
-            # 총합 추가
-            summary_lines.append("")
-            summary_lines.append(f"총합: {total}회")
-
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write("\n".join(summary_lines))
+                f.write(self.engine.summary().export_text())
 
             msg = QMessageBox(self)
             msg.setIcon(QMessageBox.Information)
@@ -1503,131 +1494,100 @@ class CounterApp(QMainWindow):
     # DATA PERSISTENCE
     # ========================================================================
 
-    def save_data(self):
-        """모든 데이터를 presets.json 하나에 저장"""
-        self.save_current_preset()
-
-        data = {
-            "presets": self.presets,
-            "current_preset": self.current_preset,
-            "last_date": self.last_date,
-            "logs": self.logs[-100:]  # Keep last 100 logs
-        }
-
-        with open(self.presets_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-    def load_data(self):
-        """presets.json에서 모든 데이터 로드"""
-        if os.path.exists(self.presets_file):
-            try:
-                with open(self.presets_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                    # 새로운 통합 형식 (presets 키가 있는 경우)
-                    if isinstance(data, dict) and "presets" in data:
-                        loaded_presets = data["presets"]
-                        if isinstance(loaded_presets, list) and len(loaded_presets) == 3:
-                            for i, preset in enumerate(loaded_presets):
-                                if "users" in preset:
-                                    self.presets[i]["users"] = preset["users"]
-                                if "name" in preset:
-                                    self.presets[i]["name"] = preset["name"]
-                                if "click_history" in preset:
-                                    self.presets[i]["click_history"] = preset["click_history"]
-
-                        # current_preset, logs, last_date 로드
-                        self.current_preset = data.get("current_preset", 0)
-                        saved_date = data.get("last_date", "")
-
-                        if saved_date == self.last_date:
-                            self.logs = data.get("logs", [])
-                        else:
-                            self.last_date = datetime.now().strftime("%Y-%m-%d")
-
-                    # 기존 배열 형식 (하위 호환성)
-                    elif isinstance(data, list) and len(data) == 3:
-                        for i, preset in enumerate(data):
-                            if "users" in preset:
-                                self.presets[i]["users"] = preset["users"]
-                                if "name" in preset:
-                                    self.presets[i]["name"] = preset["name"]
-                                if "click_history" in preset:
-                                    self.presets[i]["click_history"] = preset["click_history"]
-                            elif "user_seats" in preset and "counters" in preset:
-                                users_dict = {}
-                                for user_name, key in preset["user_seats"].items():
-                                    count = preset["counters"].get(user_name, 0)
-                                    users_dict[key] = {
-                                        "name": user_name,
-                                        "count": count
-                                    }
-                                self.presets[i]["users"] = users_dict
-
-                        # 구 counter_data.json이 있으면 로드
-                        if os.path.exists(self.counter_data_file):
-                            try:
-                                with open(self.counter_data_file, 'r', encoding='utf-8') as cf:
-                                    counter_data = json.load(cf)
-                                    self.current_preset = counter_data.get("current_preset", 0)
-                                    saved_date = counter_data.get("date", "")
-                                    if saved_date == self.last_date:
-                                        self.logs = counter_data.get("logs", [])
-                            except:
-                                pass
-            except:
-                pass
-
-        # 프리셋 버튼 체크 상태 업데이트
-        for i, btn in enumerate(self.preset_buttons):
-            btn.setChecked(i == self.current_preset)
-
-        self.load_current_preset()
+    def save_data(self, wait=False, day_end=False):
+        """변경 사항을 스냅샷으로 떠서 백그라운드 저장 스레드에 넘김
+
+        파일 쓰기는 저장 스레드에서 하므로 GUI 스레드는 복사 비용만 부담한다.
+        바뀐 프리셋 파일과 작은 체크포인트만 쓴다.
+        wait=True이면 저장이 끝날 때까지 기다린다 (종료, 날짜 변경 시).
+        day_end=True이면 끝난 날의 클릭 이벤트를 월별 클릭 파일에 한 번 쓴다.
+        """
+        # 이전 저장/정리에서 난 오류는 조용히 넘기지 않고 알림
+        self.report_background_errors()
+
+        engine = self.engine
+        if engine.dirty:
+            engine.dirty = False
+            # 스냅샷 이후의 클릭은 새 저널 파일에 기록되도록 저널 넘기기
+            self.journal.rotate()
+            changed_presets, checkpoint = engine.snapshot_presets()
+            history_data = engine.snapshot_today_history()
+            # 클릭 이벤트는 하루가 끝났을 때만 저장 (진행 중인 날은 프리셋 파일과 저널에 있음)
+            clicks = engine.click_history.copy() if day_end else None
+            self.writer.submit(
+                SnapshotJob(self.write_snapshot, changed_presets, checkpoint, history_data, clicks)
+            )
 
-    def save_today_history(self):
-        """오늘의 기록을 히스토리에 저장"""
-        history_file = os.path.join(self.history_dir, f"{self.last_date}.json")
+        if wait:
+            self.writer.flush()
 
-        history_data = {
-            "date": self.last_date,
-            "preset": self.current_preset,
-            "users": {},
-            "logs": self.logs
-        }
+    def report_background_errors(self, closing=False):
+        """저장 스레드/정리 스레드의 실패를 로그에 남기고 메시지로 알림
 
-        for key, btn in self.numpad.buttons.items():
-            if btn.user_name and btn.count > 0:
-                history_data["users"][key] = {
-                    "name": btn.user_name,
-                    "count": btn.count
-                }
-
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
+        같은 오류가 저장 주기마다 반복되면 메시지는 처음 한 번만 띄운다.
+        저널 조각은 저장에 성공해야 지워지므로 실패한 변경은 다음 시작 때 복구된다.
+        """
+        errors = [("저장", self.writer.take_error()), ("기록 정리", self.retention.take_error())]
+        messages = [f"{label} 실패: {error}" for label, error in errors if error is not None]
+        if not messages:
+            return
+        for message in messages:
+            self.engine.add_log("[오류] {}", message)
 
-    def save_daily_history(self):
-        """매일 자동으로 히스토리 저장 및 90일 이전 로그 자동 삭제"""
-        # 오늘 날짜로 저장
-        self.save_today_history()
+        text = "\n".join(messages)
+        if not closing and text == self.last_error_text:
+            return
+        self.last_error_text = text
 
-        # 90일 이전 로그 자동 삭제
-        from datetime import timedelta
-        cutoff_date = datetime.now() - timedelta(days=90)
+        msg = QMessageBox(self)
+        msg.setIcon(QMessageBox.Warning)
+        msg.setWindowTitle("저장 오류")
+        msg.setText(f"{text}\n\n디스크 공간과 counter_data 폴더 권한을 확인해주세요.\n"
+                    "저장되지 않은 변경은 저널에 남아 다음 실행 때 복구됩니다.")
+        msg.setStyleSheet(MESSAGEBOX_DARK_STYLE)
+        msg.exec()
 
+    def load_data(self):
+        """체크포인트에서 데이터 로드 후 저널 재생 (이전 형식은 시작 시 counter_migrate가 변환)"""
+        checkpoint = read_checkpoint(self.checkpoint_file)
+        journal_seq = checkpoint.get("journal_seq", 0) if checkpoint is not None else 0
+        # 체크포인트 이후 저널에 남은 변경만 재생 (비정상 종료 복구)
+        self.engine.load(checkpoint, self.journal.load(journal_seq))
+
+    def closeEvent(self, event):
+        """종료 시 남은 변경 사항 저장"""
+        self.save_data(wait=True)
+        self.writer.stop()
+        self.retention.stop()
+        # 마지막 저장이 실패했으면 종료 전에 알림
+        self.report_background_errors(closing=True)
+        self.journal.close()
+        self.history_store.close()
         try:
-            for filename in os.listdir(self.history_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(self.history_dir, filename)
-                    try:
-                        mtime = os.path.getmtime(filepath)
-                        file_date = datetime.fromtimestamp(mtime)
-
-                        if file_date < cutoff_date:
-                            os.remove(filepath)
-                    except:
-                        pass
-        except:
+            self.storage_stats.save(os.path.join(self.data_dir, STORAGE_STATS_FILE_NAME))
+        except OSError:
             pass
+        super().closeEvent(event)
+
+    def write_snapshot(self, changed_presets, checkpoint, history_data, clicks=None):
+        """스냅샷 파일 쓰기 (저장 스레드에서 실행, Qt 위젯 접근 금지)"""
+        fsync = self.durability_mode != DURABILITY_RELAXED
+        # 프리셋 파일을 먼저 쓰고 체크포인트를 나중에 씀 (중간에 종료되어도
+        # 프리셋 파일의 journal_seq로 중복 재생을 막음)
+        for index, preset in changed_presets.items():
+            self.preset_store.save(index, preset, fsync, self.storage_stats)
+        # 지울 저널 조각의 로그를 하루치 로그로 옮김 (체크포인트보다 먼저 써야
+        # 중간에 종료되어도 조각이 남아 다음 저장 때 다시 옮겨짐, 중복은 순번으로 걸러짐)
+        log_size = self.history_store.append_day_log(
+            history_data["date"], self.journal.log_entries(checkpoint["journal_seq"]),
+            fsync, self.storage_stats)
+        write_checkpoint(self.checkpoint_file, checkpoint, fsync, self.storage_stats)
+        size = self.history_store.save_day(history_data["date"], history_data, clicks,
+                                           fsync, self.storage_stats)
+        self.retention.note_saved(history_data["date"], size + log_size)
+        self.storage_stats.add(snapshots=1)
+        # 스냅샷에 반영된 저널 조각 삭제
+        self.journal.discard_through(checkpoint["journal_seq"])
 
 
 # ============================================================================
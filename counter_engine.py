@@ -0,0 +1,810 @@
+"""
+Numpad Counter - Counter Engine
+GUI(PySide6) 없이 동작하는 카운터 핵심 로직 (사용자, 카운트, 클릭 기록, 프리셋, 취소, 로그)
+
+GUI는 버튼 입력을 엔진 메서드로 넘기고, 엔진이 알려 주는 변경 이벤트를 받아
+화면만 갱신한다. 벤치마크나 명령줄 도구도 같은 엔진을 그대로 사용할 수 있다.
+"""
+
+import bisect
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+
+from counter_storage import (apply_journal_record, decode_log_entry, format_log_entry,
+                             journal_log_entry, LOG_PREFIX_INCREMENT, LOG_TEMPLATE_INCREMENT)
+
+
+PRESET_COUNT = 3  # 프리셋 개수 (프리셋 파일은 처음 사용할 때 만들어짐)
+PAGE_KEY_SEPARATOR = "@"  # 2페이지부터의 사용자 키 (예: "7@2" = 2페이지의 7키)
+CHECKPOINT_LOG_COUNT = 100  # 체크포인트/일자별 요약에 남기는 최근 로그 수
+LOG_RING_SIZE = 500         # 메모리에 두는 최근 로그 수 (전체 로그는 저널 → 하루치 로그 파일)
+
+# 클릭 시각: 시작할 때 벽시계에 맞춘 단조 증가 시계 (ns, 시스템 시간이 바뀌어도 역행하지 않음)
+_CLOCK_ANCHOR_NS = time.time_ns() - time.monotonic_ns()
+
+
+def click_time_ns():
+    """클릭 타임스탬프 (epoch 기준 ns, monotonic_ns 기반)"""
+    return _CLOCK_ANCHOR_NS + time.monotonic_ns()
+
+
+def page_key(page, label):
+    """페이지 번호(0부터) + 넘패드 키 → 사용자 키 (1페이지는 키 이름 그대로)"""
+    return label if page == 0 else f"{label}{PAGE_KEY_SEPARATOR}{page + 1}"
+
+
+def key_page(key):
+    """사용자 키 → (페이지 번호, 넘패드 키)"""
+    label, separator, page = key.partition(PAGE_KEY_SEPARATOR)
+    return (int(page) - 1, label) if separator else (0, key)
+
+
+# 취소 기록의 클릭 항목 (클릭은 클릭 기록 마지막 항목을 지우면 되므로 표시만 둠)
+UNDO_INCREMENT = "inc"
+
+
+class ClickHistory:
+    """클릭 순서 기록 (프리셋별 사용자 테이블 + array 열)
+
+    클릭마다 (이름, 개인 카운트) 튜플을 두는 대신 사용자 번호(array 'H'),
+    개인 카운트(array 'I'), 클릭 시각(array 'q', click_time_ns 기준 ns)만 저장해
+    클릭당 14바이트로 줄인다. 시각이 없는 이전 기록은 0이다.
+    리스트처럼 append/pop/clear/len/반복/인덱싱을 지원하며 항목은 (name, count)이다.
+    시각까지 필요하면 events()를 사용한다.
+    """
+    def __init__(self, clicks=(), times=None):
+        self.names = []     # 사용자 테이블 (번호 = 위치)
+        self._ids = {}      # {이름: 번호}
+        self.user_ids = array('H')
+        self.counts = array('I')
+        self.times = array('q')
+        self.extend(clicks, times)
+
+    def user_id(self, name):
+        """이름의 번호 (처음 보는 이름이면 테이블에 추가)"""
+        user_id = self._ids.get(name)
+        if user_id is None:
+            user_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return user_id
+
+    def append(self, click, time_ns=0):
+        name, count = click
+        self.user_ids.append(self.user_id(name))
+        self.counts.append(count)
+        self.times.append(time_ns)
+
+    def extend(self, clicks, times=None):
+        clicks = list(clicks)
+        if times is None or len(times) != len(clicks):
+            times = [0] * len(clicks)
+        for click, time_ns in zip(clicks, times):
+            self.append(click, time_ns)
+
+    def pop(self):
+        self.times.pop()
+        return self.names[self.user_ids.pop()], self.counts.pop()
+
+    def clear(self):
+        """기록 삭제 (사용자 테이블은 다음 클릭에 다시 쓰이므로 유지)"""
+        del self.user_ids[:]
+        del self.counts[:]
+        del self.times[:]
+
+    def events(self):
+        """(name, count, time_ns) 순서대로"""
+        names = self.names
+        for user_id, count, time_ns in zip(self.user_ids, self.counts, self.times):
+            yield names[user_id], count, time_ns
+
+    def count_since(self, time_ns):
+        """time_ns 이후 클릭 수 (시각은 단조 증가하므로 이진 탐색)"""
+        return len(self.times) - bisect.bisect_left(self.times, time_ns)
+
+    def copy(self):
+        """저장용 복사본 (array 복사라 클릭 수가 많아도 빠름)"""
+        copied = ClickHistory()
+        copied.names = list(self.names)
+        copied._ids = dict(self._ids)
+        copied.user_ids = array('H', self.user_ids)
+        copied.counts = array('I', self.counts)
+        copied.times = array('q', self.times)
+        return copied
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __iter__(self):
+        names = self.names
+        for user_id, count in zip(self.user_ids, self.counts):
+            yield names[user_id], count
+
+    def __getitem__(self, index):
+        return self.names[self.user_ids[index]], self.counts[index]
+
+
+class ClickAggregates:
+    """현재 프리셋의 집계값 (클릭/취소/카운트 변경마다 조금씩만 갱신)
+
+    - total: 전체 카운트 합
+    - board: 카운트가 있는 사용자 [(-count, key), ...] 정렬 상태 유지 (이진 탐색)
+    - orders: {이름: array('I')} 이름별 클릭의 전체 순번 (마지막 순번, 개인 카운트 → 순번)
+
+    이름별 개인 카운트는 보통 1, 2, 3...으로 이어지므로 n번째 클릭의 순번은
+    orders[이름][n - 1]이다. 같은 날 삭제된 이름을 다시 등록하는 등 이어지지
+    않는 이름(irregular)만 그 이름의 클릭을 훑어서 구한다.
+    """
+    def __init__(self):
+        self.history = ClickHistory()
+        self.total = 0
+        self.board = []
+        self.orders = {}
+        self.irregular = set()
+
+    def rebuild(self, users, history):
+        """사용자/클릭 기록 전체로 다시 계산 (프리셋 전환, 로드, 초기화 시)"""
+        self.history = history
+        self.total = sum(user["count"] for user in users.values())
+        self.board = sorted((-user["count"], key) for key, user in users.items() if user["count"] > 0)
+        self.orders = {}
+        self.irregular = set()
+        for order, (name, count) in enumerate(history, 1):
+            orders = self.orders.setdefault(name, array('I'))
+            if count != len(orders) + 1:
+                self.irregular.add(name)
+            orders.append(order)
+
+    def count_changed(self, key, old_count, new_count):
+        """사용자 카운트 변경 반영 (총합, 순위)"""
+        self.total += new_count - old_count
+        if old_count > 0:
+            index = bisect.bisect_left(self.board, (-old_count, key))
+            del self.board[index]
+        if new_count > 0:
+            bisect.insort(self.board, (-new_count, key))
+
+    def click_added(self, name, count):
+        """클릭 기록 뒤에 (name, count)가 추가됨"""
+        orders = self.orders.setdefault(name, array('I'))
+        if count != len(orders) + 1:
+            self.irregular.add(name)
+        orders.append(len(self.history))
+
+    def click_removed(self, name):
+        """클릭 기록 마지막 항목(name의 마지막 클릭)이 취소됨"""
+        orders = self.orders[name]
+        orders.pop()
+        if not orders:
+            del self.orders[name]
+            self.irregular.discard(name)
+
+    def name_added(self, name):
+        """이미 클릭 기록이 있는 이름을 다시 쓰면 개인 카운트가 1부터 다시 시작됨"""
+        if name in self.orders:
+            self.irregular.add(name)
+
+    def last_order(self, name):
+        """이름의 마지막 클릭 순번 (없으면 0)"""
+        orders = self.orders.get(name)
+        return orders[-1] if orders else 0
+
+    def order_of(self, name, count):
+        """이름의 개인 카운트 count번째 클릭의 전체 순번 (없으면 0, 같은 카운트가 여럿이면 최근 것)"""
+        orders = self.orders.get(name)
+        if not orders:
+            return 0
+        if name not in self.irregular:
+            return orders[count - 1] if 0 < count <= len(orders) else 0
+        counts = self.history.counts
+        for order in reversed(orders):
+            if counts[order - 1] == count:
+                return order
+        return 0
+
+    def max_count(self, name):
+        """이름의 가장 큰 개인 카운트"""
+        orders = self.orders.get(name)
+        if not orders:
+            return 0
+        if name not in self.irregular:
+            return len(orders)
+        counts = self.history.counts
+        return max(counts[order - 1] for order in orders)
+
+    def max_rows(self, names=None):
+        """히스토리 표의 행 수 (names 중 가장 큰 개인 카운트, None이면 모든 이름)"""
+        return max((self.max_count(name) for name in (self.orders if names is None else names)),
+                   default=0)
+
+
+class UserRegistry:
+    """현재 프리셋 사용자 색인 (키 → 사용자, 이름 → 키, 등록 순서, 페이지)
+
+    중복 이름 확인, 취소할 사용자 찾기, 히스토리 표 컬럼 순서를 버튼을 훑지 않고
+    바로 구한다. 키 개수가 많아져도 조회 비용은 그대로이고, 페이지별 조회는
+    그 페이지의 사용자 수에만 비례한다.
+    """
+    def __init__(self, users=None):
+        self.rebuild(users if users is not None else {})
+
+    def rebuild(self, users):
+        self.users = users                # {키: {"name", "count", "order"}} (프리셋 데이터 그대로)
+        self.by_name = {}                 # {이름: [키, ...]} (이전 데이터에는 같은 이름이 있을 수 있음)
+        self.ordered = []                 # [(등록 순서, 키), ...] 정렬 상태 유지
+        self.by_page = {}                 # {페이지: [(등록 순서, 키), ...]} 정렬 상태 유지
+        for key, user in users.items():
+            self.by_name.setdefault(user["name"], []).append(key)
+            self.ordered.append((user.get("order", 0), key))
+            self.by_page.setdefault(key_page(key)[0], []).append((user.get("order", 0), key))
+        self.ordered.sort()
+        for entries in self.by_page.values():
+            entries.sort()
+
+    def key_of(self, name):
+        """이름이 등록된 키 (없으면 None)"""
+        keys = self.by_name.get(name)
+        return keys[0] if keys else None
+
+    def is_duplicate_name(self, name, key=None):
+        """다른 키에 같은 이름이 있는지 확인"""
+        return any(other != key for other in self.by_name.get(name, ()))
+
+    def add(self, key, user):
+        self.users[key] = user
+        self.by_name.setdefault(user["name"], []).append(key)
+        bisect.insort(self.ordered, (user.get("order", 0), key))
+        bisect.insort(self.by_page.setdefault(key_page(key)[0], []), (user.get("order", 0), key))
+
+    def rename(self, key, new_name):
+        user = self.users[key]
+        self._unlink_name(user["name"], key)
+        user["name"] = new_name
+        self.by_name.setdefault(new_name, []).append(key)
+
+    def remove(self, key):
+        user = self.users.pop(key)
+        self._unlink_name(user["name"], key)
+        entry = (user.get("order", 0), key)
+        del self.ordered[bisect.bisect_left(self.ordered, entry)]
+        page_entries = self.by_page[key_page(key)[0]]
+        del page_entries[bisect.bisect_left(page_entries, entry)]
+        return user
+
+    def _unlink_name(self, name, key):
+        keys = self.by_name[name]
+        keys.remove(key)
+        if not keys:
+            del self.by_name[name]
+
+    def next_order(self):
+        """새로 등록할 사용자의 순서 (가장 큰 순서 + 1)"""
+        return self.ordered[-1][0] + 1 if self.ordered else 1
+
+    def ordered_names(self, page=None):
+        """등록 순서대로 정렬한 사용자 이름 (중복 제거, page를 주면 그 페이지만)"""
+        users = self.users
+        names = []
+        seen = set()
+        for order, key in (self.ordered if page is None else self.by_page.get(page, ())):
+            name = users[key]["name"]
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+        return names
+
+
+class CounterSummary:
+    """한 시점의 카운트 요약 (실시간 로그, 클립보드 복사, TXT 저장이 함께 사용)
+
+    엔진 상태 버전마다 한 번만 만들어지고, 문자열은 처음 요청될 때 만들어 둔다.
+    """
+    def __init__(self, version, date, leaderboard, user_counts, total):
+        self.version = version
+        self.date = date
+        self.leaderboard = leaderboard  # 카운트가 있는 사용자, 많은 순서 [(name, count), ...]
+        self.user_counts = user_counts  # 모든 사용자, 키 순서 [(name, count), ...]
+        self.total = total
+        self._texts = {}
+
+    def _text(self, kind, build):
+        text = self._texts.get(kind)
+        if text is None:
+            text = self._texts[kind] = build()
+        return text
+
+    @staticmethod
+    def _format_counts(counts):
+        return [f"{name}: {count}회" for name, count in counts]
+
+    def _report(self, counts):
+        lines = [f"=== {self.date} 카운터 결과 ===", ""]
+        lines.extend(self._format_counts(counts))
+        lines.extend(["", f"총합: {self.total}회"])
+        return "\n".join(lines)
+
+    def display_text(self):
+        """실시간 로그 영역 (카운트가 없으면 빈 문자열)"""
+        return self._text("display", lambda: "\n".join(self._format_counts(self.leaderboard)))
+
+    def clipboard_text(self):
+        """클립보드 복사용 (카운트가 있는 사용자, 많은 순서)"""
+        return self._text("clipboard", lambda: self._report(self.leaderboard))
+
+    def export_text(self):
+        """TXT 저장용 (모든 사용자, 키 순서)"""
+        return self._text("export", lambda: self._report(self.user_counts))
+
+
+class CounterEngine:
+    """카운터 상태와 변경 로직
+
+    프리셋 데이터는 {"name", "users": {키: {"name", "count", "order"}}, "click_history"}
+    형태의 dict이며, 처음 사용할 때 preset_store에서 로드한다.
+    모든 변경은 저널(journal)에 한 줄씩 기록되고, 등록된 리스너에게
+    (이벤트 이름, 키) 형태로 알려진다. 키가 None이면 프리셋 전체가 바뀐 것이다.
+
+    클릭, 등록, 수정, 삭제, 초기화는 프리셋별 취소 기록에 쌓여 여러 단계
+    취소/다시 실행할 수 있다. 취소/다시 실행도 저널에는 그 결과만 작은
+    레코드로 남으므로 전체 저장이 따로 일어나지 않는다.
+    """
+    def __init__(self, preset_store=None, journal=None, preset_count=PRESET_COUNT,
+                 clock=click_time_ns):
+        self.preset_store = preset_store
+        self.journal = journal
+        self.clock = clock  # 클릭 타임스탬프 함수 (ns)
+        self.presets = [None] * preset_count      # 아직 로드하지 않은 프리셋은 None
+        self.preset_seqs = [0] * preset_count     # 프리셋 파일이 반영한 저널 순번
+        self.preset_dirty = set()                 # 마지막 스냅샷 이후 바뀐 프리셋 번호
+        self.dirty = False                        # 마지막 스냅샷 이후 변경 여부
+        self.current_preset = 0
+        self.logs = deque(maxlen=LOG_RING_SIZE)  # 최근 로그 항목 (time_ns, 템플릿, 인자)
+        self.last_date = datetime.now().strftime("%Y-%m-%d")
+        self.listeners = []
+        self.version = 0        # 상태가 바뀔 때마다 증가 (요약 캐시 무효화)
+        self._summary = None
+        self.undo_stacks = {}   # {프리셋 번호: [취소 항목, ...]}
+        self.redo_stacks = {}   # {프리셋 번호: [다시 실행 항목, ...]}
+        self.aggregates = ClickAggregates()
+        self.registry = UserRegistry()
+        self.ensure_preset(0)
+        self.rebuild_indexes()
+
+    # ========================================================================
+    # PRESETS
+    # ========================================================================
+
+    @staticmethod
+    def default_preset(index):
+        return {"name": f"프리셋 {index + 1}", "users": {}, "click_history": []}
+
+    def ensure_preset(self, index):
+        """프리셋을 처음 사용할 때 파일에서 로드 (범위 밖 번호면 False)"""
+        if not 0 <= index < len(self.presets):
+            return False
+        if self.presets[index] is None:
+            data = None
+            if self.preset_store is not None:
+                data = self.preset_store.load(index)
+            data = data or self.default_preset(index)
+            self.preset_seqs[index] = data.pop("journal_seq", 0)
+            for user in data.setdefault("users", {}).values():
+                user.setdefault("count", 0)
+            data["click_history"] = ClickHistory(data.get("click_history", ()),
+                                                 data.pop("click_times", None))
+            self.presets[index] = data
+        return True
+
+    @property
+    def preset(self):
+        """현재 프리셋 데이터"""
+        return self.presets[self.current_preset]
+
+    @property
+    def users(self):
+        """현재 프리셋의 사용자 {키: {"name", "count", "order"}}"""
+        return self.preset["users"]
+
+    @property
+    def click_history(self):
+        """현재 프리셋의 클릭 순서 기록 (ClickHistory, 항목은 (name, count))"""
+        return self.preset["click_history"]
+
+    def user(self, key):
+        """키에 등록된 사용자 (없으면 None)"""
+        return self.users.get(key)
+
+    def switch_preset(self, index):
+        """프리셋 전환 (이미 현재 프리셋이거나 범위 밖이면 False)"""
+        if index == self.current_preset or not self.ensure_preset(index):
+            return False
+        self.current_preset = index
+        self.rebuild_indexes()
+        log_entry = self.add_log("[프리셋] 프리셋 {}로 전환", index + 1)
+        self.record_change("preset", log=log_entry)
+        self.notify("preset")
+        return True
+
+    # ========================================================================
+    # COUNTING
+    # ========================================================================
+
+    def increment(self, key):
+        """키에 등록된 사용자의 카운트 1 증가 (새 카운트, 사용자가 없으면 None)"""
+        count = self._increment(key)
+        if count is not None:
+            self.undo_stack.append(UNDO_INCREMENT)
+            self.redo_stack.clear()
+        return count
+
+    def _increment(self, key, prefix=LOG_PREFIX_INCREMENT):
+        user = self.users.get(key)
+        if user is None:
+            return None
+        user["count"] += 1
+        count = user["count"]
+        name = user["name"]
+        time_ns = self.clock()
+        self.click_history.append((name, count), time_ns)
+        self.aggregates.count_changed(key, count - 1, count)
+        self.aggregates.click_added(name, count)
+        # 로그 문자열은 표시/저장할 때 만들고, 저널 레코드에는 로그를 따로 싣지 않음
+        self.logs.append((time_ns, LOG_TEMPLATE_INCREMENT, (prefix, key, name, count)))
+        # 저널에 한 줄만 추가 (전체 저장은 압축 시)
+        if prefix == LOG_PREFIX_INCREMENT:
+            self.record_change("inc", k=key, n=name, c=count, t=time_ns)
+        else:
+            self.record_change("inc", k=key, n=name, c=count, t=time_ns, pre=prefix)
+        self.notify("inc", key)
+        return count
+
+    def reset_counts(self):
+        """현재 프리셋의 모든 카운트와 클릭 기록 초기화 (이름은 유지)"""
+        counts = {key: user["count"] for key, user in self.users.items()}
+        self.undo_stack.append(("reset", counts, self.click_history))
+        self.redo_stack.clear()
+        self._reset_counts("[초기화] 모든 카운터 초기화됨")
+
+    def _reset_counts(self, message):
+        for user in self.users.values():
+            user["count"] = 0
+        # 이전 클릭 기록은 취소할 때 되살릴 수 있도록 새 기록으로 교체
+        self.preset["click_history"] = ClickHistory()
+        self.aggregates.rebuild(self.users, self.click_history)
+        log_entry = self.add_log(message)
+        self.record_change("reset", log=log_entry)
+        self.notify("reset")
+
+    def start_new_day(self, today):
+        """날짜 변경: 카운트/클릭 기록/로그/취소 기록 초기화 (지난 날짜는 호출 전에 저장)"""
+        for user in self.users.values():
+            user["count"] = 0
+        self.click_history.clear()
+        self.aggregates.rebuild(self.users, self.click_history)
+        self.undo_stacks.clear()
+        self.redo_stacks.clear()
+        self.logs.clear()
+        self.last_date = today
+        self.add_log("[자동] 날짜가 변경되어 카운터가 초기화되었습니다")
+        self.preset_dirty.add(self.current_preset)
+        self.dirty = True
+        self.notify("day")
+
+    # ========================================================================
+    # USERS
+    # ========================================================================
+
+    def is_duplicate_name(self, name, key=None):
+        """다른 키에 같은 이름이 있는지 확인"""
+        return self.registry.is_duplicate_name(name, key)
+
+    def register_user(self, key, name):
+        """빈 키에 사용자 등록 (등록 순서 = 현재 프리셋에서 가장 큰 순서 + 1)"""
+        user = {"name": name, "count": 0, "order": self.registry.next_order()}
+        self.aggregates.name_added(name)
+        self._add_user(key, user, "reg", "[등록] {}: '{}' 등록됨", key, name)
+        self.undo_stack.append(("reg", key, dict(user)))
+        self.redo_stack.clear()
+
+    def modify_user(self, key, new_name):
+        """사용자 이름 변경 (새로운 사용자로 간주해 카운트 초기화)"""
+        old_user = dict(self.users[key])
+        self.aggregates.name_added(new_name)
+        self._rename_user(key, new_name, 0, "mod", "[수정] {}: '{}' → '{}' (카운트 초기화)",
+                          key, old_user["name"], new_name)
+        self.undo_stack.append(("mod", key, old_user, new_name))
+        self.redo_stack.clear()
+
+    def delete_user(self, key):
+        user = self._remove_user(key, "[삭제] {}: '{}' 삭제됨", key, self.users[key]["name"])
+        self.undo_stack.append(("del", key, user))
+        self.redo_stack.clear()
+
+    def _add_user(self, key, user, op, message, *args):
+        """사용자 추가 ("reg"는 새 등록, "set"은 취소로 되살림)"""
+        self.registry.add(key, user)
+        self.aggregates.count_changed(key, 0, user["count"])
+        log_entry = self.add_log(message, *args)
+        if op == "reg":
+            self.record_change("reg", k=key, n=user["name"], o=user["order"], log=log_entry)
+        else:
+            self.record_change("set", k=key, n=user["name"], c=user["count"],
+                               o=user.get("order", 0), log=log_entry)
+        self.notify(op, key)
+
+    def _rename_user(self, key, name, count, op, message, *args):
+        """이름과 카운트 변경 ("mod"는 수정, "set"은 취소로 이전 값 복원)"""
+        user = self.users[key]
+        self.aggregates.count_changed(key, user["count"], count)
+        self.registry.rename(key, name)
+        user["count"] = count
+        log_entry = self.add_log(message, *args)
+        if op == "mod":
+            self.record_change("mod", k=key, n=name, log=log_entry)
+        else:
+            self.record_change("set", k=key, n=name, c=count, o=user.get("order", 0), log=log_entry)
+        self.notify(op, key)
+
+    def _remove_user(self, key, message, *args):
+        user = self.registry.remove(key)
+        self.aggregates.count_changed(key, user["count"], 0)
+        log_entry = self.add_log(message, *args)
+        self.record_change("del", k=key, log=log_entry)
+        self.notify("del", key)
+        return dict(user)
+
+    # ========================================================================
+    # UNDO / REDO
+    # ========================================================================
+
+    @property
+    def undo_stack(self):
+        return self.undo_stacks.setdefault(self.current_preset, [])
+
+    @property
+    def redo_stack(self):
+        return self.redo_stacks.setdefault(self.current_preset, [])
+
+    def undo(self):
+        """최근 작업 취소 (되돌릴 작업이 없으면 False)
+
+        취소 기록이 비어 있어도 클릭 기록이 남아 있으면 (프로그램을 다시 시작하기
+        전의 클릭) 마지막 클릭을 취소한다.
+        """
+        if self.undo_stack:
+            entry = self.undo_stack.pop()
+        elif self.click_history:
+            entry = UNDO_INCREMENT
+        else:
+            self.add_log("[취소] 되돌릴 작업이 없습니다")
+            return False
+
+        redo_entry = self._undo_entry(entry)
+        if redo_entry is not None:
+            self.redo_stack.append(redo_entry)
+        return True
+
+    def redo(self):
+        """취소한 작업 다시 실행 (다시 실행할 작업이 없으면 False)"""
+        if not self.redo_stack:
+            self.add_log("[다시] 다시 실행할 작업이 없습니다")
+            return False
+
+        entry = self.redo_stack.pop()
+        kind, key = entry[0], entry[1] if len(entry) > 1 else None
+        if kind == "inc":
+            if self._increment(key, "[다시]") is None:
+                return False
+            self.undo_stack.append(UNDO_INCREMENT)
+        elif kind == "reg":
+            user = entry[2]
+            self._add_user(key, dict(user), "reg", "[다시] {}: '{}' 등록됨", key, user["name"])
+            self.undo_stack.append(entry)
+        elif kind == "mod":
+            old_user, new_name = entry[2], entry[3]
+            self._rename_user(key, new_name, 0, "mod", "[다시] {}: '{}' → '{}' (카운트 초기화)",
+                              key, old_user["name"], new_name)
+            self.undo_stack.append(entry)
+        elif kind == "del":
+            user = self._remove_user(key, "[다시] {}: '{}' 삭제됨", key, entry[2]["name"])
+            self.undo_stack.append(("del", key, user))
+        elif kind == "reset":
+            counts = {key: user["count"] for key, user in self.users.items()}
+            self.undo_stack.append(("reset", counts, self.click_history))
+            self._reset_counts("[다시] 모든 카운터 초기화됨")
+        return True
+
+    def _undo_entry(self, entry):
+        """취소 항목 하나 되돌리고 다시 실행 항목 반환"""
+        if entry == UNDO_INCREMENT:
+            key = self._undo_increment()
+            return ("inc", key) if key is not None else None
+
+        kind, key = entry[0], entry[1] if entry[0] != "reset" else None
+        if kind == "reg":
+            self._remove_user(key, "[취소] {}: '{}' 등록 취소", key, entry[2]["name"])
+        elif kind == "mod":
+            old_user = entry[2]
+            self._rename_user(key, old_user["name"], old_user["count"], "set",
+                              "[취소] {}: '{}' → '{}' (수정 취소)", key, entry[3], old_user["name"])
+        elif kind == "del":
+            user = entry[2]
+            self._add_user(key, dict(user), "set", "[취소] {}: '{}' 삭제 취소", key, user["name"])
+        elif kind == "reset":
+            self._restore_counts(entry[1], entry[2])
+            return ("reset",)
+        return entry
+
+    def _undo_increment(self):
+        """마지막 클릭 취소, 되돌린 키 반환 (해당 사용자가 없으면 기록만 지우고 None)"""
+        last_name, last_count = self.click_history.pop()
+        self.aggregates.click_removed(last_name)
+        for key in self.registry.by_name.get(last_name, ()):
+            user = self.users[key]
+            if user["count"] == last_count:
+                user["count"] -= 1
+                self.aggregates.count_changed(key, last_count, last_count - 1)
+                log_entry = self.add_log("[취소] {}: {} (총 {}회)", key, last_name, user["count"])
+                self.record_change("undo", k=key, c=user["count"], log=log_entry)
+                self.notify("undo", key)
+                return key
+
+        # 이름이 바뀌었거나 삭제된 사용자의 클릭: 기록만 되돌림 (재생 시에도 같은 결과)
+        log_entry = self.add_log("[취소] {}의 클릭 취소 (현재 등록되지 않은 이름)", last_name)
+        self.record_change("undo", k=None, log=log_entry)
+        self.notify("undo", None)
+        return None
+
+    def _restore_counts(self, counts, history):
+        """초기화 취소: 카운트와 클릭 기록 복원 (저널에는 사용자 테이블 + 번호 열로 기록)"""
+        for key, count in counts.items():
+            if key in self.users:
+                self.users[key]["count"] = count
+        self.preset["click_history"] = history
+        self.aggregates.rebuild(self.users, history)
+        log_entry = self.add_log("[취소] 초기화 취소 (카운트 복원)")
+        clicks = [value for pair in zip(history.user_ids, history.counts) for value in pair]
+        self.record_change("restore", u=counts, t=list(history.names), h=clicks,
+                           ts=list(history.times), log=log_entry)
+        self.notify("restore")
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def rebuild_indexes(self):
+        """현재 프리셋의 사용자 색인과 집계값 다시 만들기 (프리셋 전환, 로드 시)"""
+        self.registry.rebuild(self.users)
+        self.aggregates.rebuild(self.users, self.click_history)
+
+    def total_count(self):
+        return self.aggregates.total
+
+    def last_order(self, name):
+        """이름의 마지막 클릭 전체 순번 (클릭이 없으면 0)"""
+        return self.aggregates.last_order(name)
+
+    def user_counts(self, include_zero=False):
+        """[(name, count), ...] 키 순서 (include_zero=False이면 카운트가 있는 사용자만)"""
+        return [(user["name"], user["count"]) for key, user in sorted(self.users.items())
+                if include_zero or user["count"] > 0]
+
+    def leaderboard(self):
+        """카운트가 있는 사용자를 카운트가 많은 순서로 [(name, count), ...] (같으면 키 순서)"""
+        users = self.users
+        return [(users[key]["name"], -negative_count) for negative_count, key in self.aggregates.board]
+
+    def ordered_user_names(self, page=None):
+        """등록 순서대로 정렬한 사용자 이름 (중복 제거, page를 주면 그 페이지만)"""
+        return self.registry.ordered_names(page)
+
+    def summary(self):
+        """현재 상태의 요약 (상태가 바뀌지 않았으면 이전 요약을 그대로 반환)"""
+        if self._summary is None or self._summary.version != self.version:
+            self._summary = CounterSummary(self.version, self.last_date, self.leaderboard(),
+                                           self.user_counts(include_zero=True), self.total_count())
+        return self._summary
+
+    # ========================================================================
+    # LOG / JOURNAL / OBSERVERS
+    # ========================================================================
+
+    def add_log(self, template, *args):
+        """로그 항목 추가 후 반환 (문자열은 format_log_entry로 필요할 때 만듦)
+
+        사용자 이름 같은 값은 템플릿에 넣지 않고 args로 넘긴다.
+        """
+        log_entry = (self.clock(), template, args)
+        self.logs.append(log_entry)
+        return log_entry
+
+    def recent_logs(self, count=CHECKPOINT_LOG_COUNT):
+        """최근 로그 count줄 (문자열)"""
+        return [format_log_entry(log_entry) for log_entry in list(self.logs)[-count:]]
+
+    def record_change(self, op, **fields):
+        """상태 변경을 저널에 한 줄로 기록하고 저장 대상으로 표시"""
+        if self.journal is not None:
+            self.journal.append(op, p=self.current_preset, **fields)
+        if op != "preset":
+            self.preset_dirty.add(self.current_preset)
+        self.dirty = True
+
+    def add_listener(self, listener):
+        """변경 이벤트 리스너 등록 listener(event, key)"""
+        self.listeners.append(listener)
+
+    def notify(self, event, key=None):
+        self.version += 1
+        for listener in self.listeners:
+            listener(event, key)
+
+    # ========================================================================
+    # LOAD / SNAPSHOT
+    # ========================================================================
+
+    def load(self, checkpoint=None, records=()):
+        """체크포인트 적용 후 저널 레코드 재생 (비정상 종료 복구)
+
+        재생에 필요한 프리셋만 로드하고, 프리셋 파일에 이미 반영된 레코드는 건너뛴다.
+        """
+        keep_logs = True
+        if checkpoint is not None:
+            self.current_preset = checkpoint.get("current_preset", 0)
+            keep_logs = checkpoint.get("last_date") == self.last_date
+            if keep_logs:
+                self.logs.clear()
+                self.logs.extend(decode_log_entry(log) for log in checkpoint.get("logs", []))
+
+        for record in records:
+            index = record.get("p", 0)
+            if record.get("op") == "preset":
+                if 0 <= index < len(self.presets):
+                    self.current_preset = index
+            elif self.ensure_preset(index) and record["seq"] > self.preset_seqs[index]:
+                apply_journal_record(self.presets[index], record)
+                self.preset_dirty.add(index)
+            if keep_logs:
+                log_entry = journal_log_entry(record)
+                if log_entry is not None:
+                    self.logs.append(log_entry)
+            self.dirty = True
+
+        if not self.ensure_preset(self.current_preset):
+            self.current_preset = 0
+        self.rebuild_indexes()
+        self.notify("load")
+
+    def snapshot_presets(self):
+        """바뀐 프리셋의 복사본 {번호: 데이터}와 체크포인트 데이터"""
+        seq = self.journal.seq if self.journal is not None else 0  # 이 순번까지의 저널은 반영됨
+
+        changed_presets = {}
+        for index in self.preset_dirty:
+            preset = self.presets[index]
+            copied = dict(preset)
+            copied["users"] = {key: dict(user) for key, user in preset["users"].items()}
+            copied["click_history"] = preset["click_history"].copy()
+            copied["journal_seq"] = seq
+            changed_presets[index] = copied
+            self.preset_seqs[index] = seq
+        self.preset_dirty.clear()
+
+        checkpoint = {
+            "current_preset": self.current_preset,
+            "last_date": self.last_date,
+            "journal_seq": seq,
+            "logs": list(self.logs)[-CHECKPOINT_LOG_COUNT:]
+        }
+        return changed_presets, checkpoint
+
+    def snapshot_today_history(self):
+        """오늘의 히스토리에 저장할 데이터 복사본"""
+        return {
+            "date": self.last_date,
+            "preset": self.current_preset,
+            "users": {key: {"name": user["name"], "count": user["count"]}
+                      for key, user in self.users.items() if user["count"] > 0},
+            "logs": self.recent_logs()  # 하루 전체 로그는 저널에서 하루치 로그 파일로 옮김
+        }
@@ -0,0 +1,1018 @@
+"""
+Numpad Counter - History Store
+일자별 히스토리 저장소 (JSON 파일 디렉토리 / SQLite), 클릭 이벤트 파일, 요약 목록, 월별 압축 보관, 보관 기간 관리
+"""
+
+import bisect
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zipfile
+from datetime import date as Date, datetime, timedelta
+
+from counter_storage import format_log_entry, write_atomic, write_json
+
+
+# ============================================================================
+# HISTORY CONFIGURATION
+# ============================================================================
+HISTORY_BACKEND_JSON = "json"      # history/YYYY-MM-DD.json (기존 형식)
+HISTORY_BACKEND_SQLITE = "sqlite"  # history.sqlite3 (WAL, 날짜/사용자 인덱스)
+HISTORY_BACKEND = HISTORY_BACKEND_JSON
+HISTORY_DB_FILE_NAME = "history.sqlite3"
+HISTORY_RETENTION_DAYS = 90  # 히스토리 보관 기간 (일)
+HISTORY_MAX_BYTES = 0        # 히스토리 전체 용량 한도 (0이면 제한 없음)
+HISTORY_ARCHIVE_DIR_NAME = "archive"  # 지난 달 묶음 (history/archive/YYYY-MM.zip)
+# 날짜마다 따로 압축되므로 하루치만 풀어서 읽을 수 있음 (ZIP_LZMA로 바꾸면 더 작아짐)
+HISTORY_ARCHIVE_COMPRESSION = zipfile.ZIP_DEFLATED
+HISTORY_MANIFEST_FILE_NAME = "manifest.json"  # 날짜별 요약 목록 (일자별 로그 창용)
+HISTORY_MANIFEST_VERSION = 1
+MANIFEST_RECENT_LOGS = 20    # 요약에 담는 최근 로그 줄 수
+HISTORY_CLICKS_DIR_NAME = "clicks"  # 월별 클릭 이벤트 파일 (history/clicks/YYYY-MM.bin)
+HISTORY_LOGS_DIR_NAME = "logs"      # 하루치 전체 로그 (history/logs/YYYY-MM-DD.jsonl)
+# 클릭 이벤트 고정 길이 레코드: 날짜(YYYYMMDD), 순번, 사용자 id, 개인 카운트 (16바이트)
+CLICK_RECORD = struct.Struct("<IIII")
+
+
+def parse_day(name):
+    """'YYYY-MM-DD' 형식이면 그대로, 아니면 None"""
+    try:
+        datetime.strptime(name, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return name
+
+
+def summarize_day(data):
+    """하루치 기록 요약 (총 카운트, 활동 사용자 수, 사용자별 카운트, 최근 로그)"""
+    counts = {}
+    for user in data.get("users", {}).values():
+        counts[user.get("name", "")] = user.get("count", 0)
+    return {
+        "total": sum(counts.values()),
+        "active_users": sum(1 for count in counts.values() if count > 0),
+        "counts": counts,
+        "recent_logs": data.get("logs", [])[-MANIFEST_RECENT_LOGS:],
+    }
+
+
+# ============================================================================
+# CLICK EVENT FILES
+# ============================================================================
+
+class ClickEventLog:
+    """월별 클릭 이벤트 파일 (history/clicks/YYYY-MM.bin + users.json)
+
+    레코드가 고정 길이(CLICK_RECORD)이고 (날짜, 순번) 순으로 정렬되어 있어서
+    mmap 위에서 날짜 경계를 이진 탐색한 뒤 그 구간만 읽는다. 기간 조회가
+    파일 전체를 메모리에 올리지 않으므로 보관 기간이 길어져도 사용량이 일정하다.
+    사용자 이름은 users.json의 번호로 저장한다.
+    하루치는 그날이 끝날 때 한 번만 기록한다 (진행 중인 날의 클릭은 프리셋 파일에 있음).
+    """
+    def __init__(self, clicks_dir):
+        self.clicks_dir = clicks_dir
+        self.users_path = os.path.join(clicks_dir, "users.json")
+        self._users = None     # [이름, ...] (번호 = 위치)
+        self._user_ids = None  # {이름: 번호}
+        # 저장 스레드(기록), 보관 스레드(삭제), GUI 스레드(조회)가 함께 사용
+        # (Windows에서는 매핑된 파일을 자르거나 교체할 수 없으므로 같은 잠금으로 보호)
+        self._lock = threading.Lock()
+        os.makedirs(clicks_dir, exist_ok=True)
+
+    def month_path(self, month):
+        return os.path.join(self.clicks_dir, f"{month}.bin")
+
+    @staticmethod
+    def date_key(date):
+        return int(date.replace("-", ""))
+
+    @staticmethod
+    def key_date(key):
+        key = str(key)
+        return f"{key[:4]}-{key[4:6]}-{key[6:]}"
+
+    def _load_users(self):
+        if self._users is None:
+            try:
+                with open(self.users_path, 'rb') as f:
+                    self._users = json.loads(f.read())
+            except (OSError, ValueError):
+                self._users = []
+            self._user_ids = {name: i for i, name in enumerate(self._users)}
+        return self._users
+
+    def _user_id(self, name):
+        """이름의 번호 (처음 보는 이름이면 새로 추가)"""
+        self._load_users()
+        user_id = self._user_ids.get(name)
+        if user_id is None:
+            user_id = self._user_ids[name] = len(self._users)
+            self._users.append(name)
+        return user_id
+
+    def _write_users(self):
+        payload = json.dumps(self._users, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        write_atomic(self.users_path, payload)
+
+    @staticmethod
+    def _lower_bound(view, count, key):
+        """날짜가 key 이상인 첫 레코드 번호 (레코드 날짜 필드만 읽음)"""
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            if CLICK_RECORD.unpack_from(view, mid * CLICK_RECORD.size)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _scan(self, month, start_key, end_key, func):
+        """월 파일에서 날짜가 [start_key, end_key]인 구간의 memoryview로 func 호출"""
+        try:
+            f = open(self.month_path(month), 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            # 기록 도중 종료되어 잘린 마지막 레코드는 무시
+            count = os.fstat(f.fileno()).st_size // CLICK_RECORD.size
+            if count == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    start = self._lower_bound(view, count, start_key)
+                    end = self._lower_bound(view, count, end_key + 1)
+                    return func(view[start * CLICK_RECORD.size:end * CLICK_RECORD.size],
+                                start, end, count)
+
+    def save_day(self, date, clicks, fsync=False, stats=None):
+        """하루치 클릭 이벤트를 교체 저장 (보통 마지막 날짜라 잘라내고 이어 씀)"""
+        key = self.date_key(date)
+        with self._lock:
+            users_before = len(self._load_users())
+            payload = b"".join(CLICK_RECORD.pack(key, seq, self._user_id(name), count)
+                               for seq, (name, count) in enumerate(clicks, 1))
+            if len(self._users) != users_before:
+                self._write_users()
+
+            path = self.month_path(date[:7])
+            bounds = self._scan(date[:7], key, key, lambda view, start, end, count: (start, end, count))
+            start, end, count = bounds or (0, 0, 0)
+            if end == count and os.path.exists(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(start * CLICK_RECORD.size)
+                    f.seek(0, os.SEEK_END)
+                    f.write(payload)
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                if stats is not None:
+                    stats.add(bytes_written=len(payload), fsyncs=1 if fsync else 0)
+            else:
+                # 지난 날짜를 다시 쓰는 경우 (가져오기 등): 앞뒤 구간을 이어 새 파일로 교체
+                self._splice(path, start, end, payload, fsync, stats)
+
+    def _splice(self, path, start, end, payload, fsync=False, stats=None):
+        """레코드 [start, end) 구간을 payload로 바꾼 파일로 교체 (비면 삭제)"""
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(start * CLICK_RECORD.size)
+                f.seek(end * CLICK_RECORD.size)
+                tail = f.read()
+        except FileNotFoundError:
+            head = tail = b""
+        tail = tail[:len(tail) // CLICK_RECORD.size * CLICK_RECORD.size]
+
+        data = head + payload + tail
+        if data:
+            write_atomic(path, data, fsync, stats)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def day_clicks(self, date):
+        """하루치 클릭 이벤트 [(이름, 개인 카운트), ...]"""
+        key = self.date_key(date)
+        with self._lock:
+            users = self._load_users()
+            records = self._scan(date[:7], key, key,
+                                 lambda view, *bounds: list(CLICK_RECORD.iter_unpack(view)))
+        return [(users[user_id], count) for _, _, user_id, count in records or ()]
+
+    def user_clicks(self, name, start_date, end_date):
+        """기간 내 특정 사용자의 클릭 이벤트 [(date, seq, count), ...]
+
+        기간에 걸친 월 파일만 열고, 각 파일에서도 해당 날짜 구간의 페이지만 읽는다.
+        """
+        start_key, end_key = self.date_key(start_date), self.date_key(end_date)
+
+        def collect(view, *bounds):
+            return [(self.key_date(key), seq, count)
+                    for key, seq, record_user, count in CLICK_RECORD.iter_unpack(view)
+                    if record_user == user_id]
+
+        result = []
+        with self._lock:
+            self._load_users()
+            user_id = self._user_ids.get(name)
+            if user_id is None:
+                return result
+            for month in self.months():
+                if start_date[:7] <= month <= end_date[:7]:
+                    result.extend(self._scan(month, start_key, end_key, collect) or ())
+        return result
+
+    def months(self):
+        return sorted(filename[:-len('.bin')] for filename in os.listdir(self.clicks_dir)
+                      if filename.endswith('.bin'))
+
+    def delete_days(self, dates):
+        """날짜 목록의 클릭 이벤트 삭제 (월 파일마다 한 번씩 다시 씀)"""
+        by_month = {}
+        for date in dates:
+            by_month.setdefault(date[:7], set()).add(self.date_key(date))
+
+        with self._lock:
+            for month, keys in by_month.items():
+                path = self.month_path(month)
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                except FileNotFoundError:
+                    continue
+                kept = b"".join(record for record in
+                                (data[i:i + CLICK_RECORD.size]
+                                 for i in range(0, len(data) - CLICK_RECORD.size + 1, CLICK_RECORD.size))
+                                if CLICK_RECORD.unpack(record)[0] not in keys)
+                if kept:
+                    write_atomic(path, kept)
+                else:
+                    os.remove(path)
+
+
+# ============================================================================
+# DAY LOG FILES
+# ============================================================================
+
+class DayLogFiles:
+    """하루치 전체 로그 (history/logs/YYYY-MM-DD.jsonl, 한 줄에 [저널 순번, 로그 문자열])
+
+    메모리에는 최근 로그만 두고, 저널 조각을 지우기 전에 그 로그를 이 파일에 덧붙인다.
+    저널 순번이 이미 기록된 것 이하인 항목은 건너뛰므로, 저장 도중 종료되어
+    같은 조각을 다시 옮겨도 중복되지 않는다.
+    """
+    def __init__(self, logs_dir):
+        self.logs_dir = logs_dir
+        self._last_seqs = {}  # {날짜: 마지막으로 기록한 저널 순번}
+        self._lock = threading.Lock()
+
+    def day_path(self, date):
+        return os.path.join(self.logs_dir, f"{date}.jsonl")
+
+    def _last_seq(self, path):
+        """파일 마지막 줄의 저널 순번 (기록 도중 잘린 줄은 잘라냄)"""
+        try:
+            with open(path, 'r+b') as f:
+                size = f.seek(0, os.SEEK_END)
+                start = max(0, size - 4096)
+                f.seek(start)
+                tail = f.read()
+                if tail and not tail.endswith(b"\n"):
+                    f.truncate(start + tail.rfind(b"\n") + 1)
+                    tail = tail[:tail.rfind(b"\n") + 1]
+        except FileNotFoundError:
+            return 0
+        for line in reversed(tail.splitlines()):
+            try:
+                return json.loads(line)[0]
+            except (ValueError, IndexError, TypeError):
+                continue
+        return 0
+
+    def append(self, date, entries, fsync=False, stats=None):
+        """(저널 순번, 로그 항목)들을 문자열로 만들어 덧붙이고 파일 크기 반환"""
+        path = self.day_path(date)
+        with self._lock:
+            last_seq = self._last_seqs.get(date)
+            if last_seq is None:
+                last_seq = self._last_seq(path)
+            lines = []
+            for seq, entry in entries:
+                if seq > last_seq:
+                    lines.append(json.dumps([seq, format_log_entry(entry)], ensure_ascii=False))
+                    last_seq = seq
+            self._last_seqs[date] = last_seq
+            if not lines:
+                try:
+                    return os.path.getsize(path)
+                except OSError:
+                    return 0
+
+            payload = ("\n".join(lines) + "\n").encode('utf-8')
+            os.makedirs(self.logs_dir, exist_ok=True)
+            with open(path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+                size = f.tell()
+        if stats is not None:
+            stats.add(bytes_written=len(payload), fsyncs=1 if fsync else 0)
+        return size
+
+    def lines(self, date):
+        """하루치 로그 문자열 스트리밍 (파일이 없으면 아무것도 없음)"""
+        try:
+            with open(self.day_path(date), 'rb') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)[1]
+                    except (ValueError, IndexError, TypeError):
+                        continue
+        except FileNotFoundError:
+            return
+
+    def exists(self, date):
+        return os.path.exists(self.day_path(date))
+
+    def sizes(self):
+        """{날짜: 바이트 수}"""
+        sizes = {}
+        if not os.path.isdir(self.logs_dir):
+            return sizes
+        with os.scandir(self.logs_dir) as entries:
+            for entry in entries:
+                date = parse_day(entry.name[:-len('.jsonl')]) if entry.name.endswith('.jsonl') else None
+                if date is not None:
+                    try:
+                        sizes[date] = entry.stat().st_size
+                    except OSError:
+                        pass
+        return sizes
+
+    def delete_days(self, dates):
+        with self._lock:
+            for date in dates:
+                self._last_seqs.pop(date, None)
+                try:
+                    os.remove(self.day_path(date))
+                except FileNotFoundError:
+                    pass
+
+
+# ============================================================================
+# JSON DIRECTORY STORE
+# ============================================================================
+
+class JsonHistoryStore:
+    """하루 한 파일(history/YYYY-MM-DD.json) 히스토리 저장소
+
+    지난 달의 파일들은 archive/YYYY-MM.zip 하나로 묶는다. zip의 중앙 디렉토리가
+    날짜별 오프셋 인덱스 역할을 하므로 하루치를 읽을 때 그 날짜만 압축을 푼다.
+
+    manifest.json에는 날짜별 요약과 위치(크기, 묶음 내 오프셋)를 모아 두어
+    일자별 로그 창은 이 파일 하나만 읽는다. 저장할 때마다 바뀌는 오늘의 요약은
+    메모리에만 두고 날짜 변경/묶기/삭제/종료 때만 manifest에 합쳐 쓰므로, 저장
+    비용이 쌓인 날짜 수와 무관하다. 비정상 종료로 빠진 요약은 다음 로드 때
+    날짜 파일 크기를 비교해 그 날짜만 다시 만든다.
+
+    클릭 이벤트는 고정 길이 레코드 파일(ClickEventLog)에, 하루 전체 로그는
+    하루치 로그 파일(DayLogFiles)에 따로 저장하고 날짜 파일에는 최근 로그만 둔다.
+    """
+    def __init__(self, history_dir):
+        self.history_dir = history_dir
+        self.archive_dir = os.path.join(history_dir, HISTORY_ARCHIVE_DIR_NAME)
+        self.manifest_path = os.path.join(history_dir, HISTORY_MANIFEST_FILE_NAME)
+        self._manifest = None  # {날짜: 요약}, 처음 사용할 때 로드
+        self._open_day = None  # 아직 manifest에 쓰지 않은 오늘의 (날짜, 요약)
+        self._manifest_lock = threading.Lock()
+        os.makedirs(history_dir, exist_ok=True)
+        self.click_log = ClickEventLog(os.path.join(history_dir, HISTORY_CLICKS_DIR_NAME))
+        self.day_log = DayLogFiles(os.path.join(history_dir, HISTORY_LOGS_DIR_NAME))
+
+    def day_path(self, date):
+        return os.path.join(self.history_dir, f"{date}.json")
+
+    def bundle_path(self, month):
+        return os.path.join(self.archive_dir, f"{month}.zip")
+
+    def save_day(self, date, data, clicks=None, fsync=False, stats=None):
+        """하루치 기록 저장 (클릭 이벤트는 월별 클릭 파일에), 크기 반환"""
+        size = write_json(self.day_path(date), data, fsync, stats)
+        if clicks is not None:
+            self.click_log.save_day(date, clicks, fsync, stats)
+        summary = summarize_day(data)
+        summary["size"] = size
+        summary["mtime_ns"] = os.stat(self.day_path(date)).st_mtime_ns
+        with self._manifest_lock:
+            # 날짜가 바뀌었으면 지난 날짜의 요약을 manifest에 합쳐 씀 (그 외에는 메모리만)
+            if self._open_day is not None and self._open_day[0] != date:
+                self._load_manifest()
+                self._write_manifest()
+            self._open_day = (date, summary)
+        return size
+
+    def load_day(self, date):
+        """하루치 기록 로드 (파일이 없으면 월별 묶음에서, 둘 다 없으면 None)"""
+        try:
+            with open(self.day_path(date), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+
+        try:
+            with zipfile.ZipFile(self.bundle_path(date[:7])) as bundle:
+                return json.loads(bundle.read(f"{date}.json"))
+        except (OSError, KeyError, zipfile.BadZipFile):
+            return None
+
+    def list_days(self):
+        """저장된 날짜 목록 (최신순)"""
+        return sorted({date for date, _ in self.day_sizes()}, reverse=True)
+
+    def day_clicks(self, date):
+        """하루치 클릭 이벤트 [(이름, 개인 카운트), ...]"""
+        return self.click_log.day_clicks(date)
+
+    def user_clicks(self, name, start_date, end_date):
+        """기간 내 특정 사용자의 클릭 이벤트 [(date, seq, count), ...]"""
+        return self.click_log.user_clicks(name, start_date, end_date)
+
+    def append_day_log(self, date, entries, fsync=False, stats=None):
+        """(저널 순번, 로그 항목)들을 하루치 로그에 덧붙이고 로그 파일 크기 반환"""
+        return self.day_log.append(date, entries, fsync, stats)
+
+    def iter_day_log(self, date):
+        """하루 전체 로그 스트리밍 (로그 파일이 없는 이전 기록은 날짜 파일의 로그)"""
+        if self.day_log.exists(date):
+            yield from self.day_log.lines(date)
+            return
+        data = self.load_day(date)
+        if data is not None:
+            yield from data.get("logs", [])
+
+    def day_summaries(self):
+        """[(날짜, 요약), ...] 최신순 - 날짜 파일을 열지 않고 manifest만 사용"""
+        with self._manifest_lock:
+            manifest = dict(self._load_manifest())
+            if self._open_day is not None:
+                date, summary = self._open_day
+                manifest[date] = dict(manifest.get(date, {}), **summary)
+            return sorted(((date, dict(summary)) for date, summary in manifest.items()),
+                          reverse=True)
+
+    def _load_manifest(self):
+        """manifest 로드 (없거나 손상되었으면 날짜 파일을 한 번 훑어 다시 만듦)"""
+        if self._manifest is not None:
+            return self._manifest
+
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                data = json.loads(f.read())
+            if data.get("version") == HISTORY_MANIFEST_VERSION:
+                self._manifest = data["days"]
+                self._refresh_stale_days()
+                return self._manifest
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+        manifest = {}
+        for date, size in self.day_sizes():
+            data = self.load_day(date)
+            if data is not None:
+                manifest[date] = dict(summarize_day(data), size=size)
+        for date, stat in self._loose_day_stats():
+            if date in manifest:
+                manifest[date]["mtime_ns"] = stat.st_mtime_ns
+        for month in self._bundle_months():
+            for date, location in self._bundle_layout(month).items():
+                if date in manifest:
+                    manifest[date].update(location)
+        self._manifest = manifest
+        self._write_manifest()
+        return manifest
+
+    def _refresh_stale_days(self):
+        """묶이지 않은 날짜 파일 중 요약이 없거나 파일이 바뀐 날짜만 다시 요약
+
+        manifest에 쓰기 전에 종료된 날(보통 마지막 실행일 하루)만 해당된다.
+        """
+        for date, stat in self._loose_day_stats():
+            summary = self._manifest.get(date, {})
+            if (summary.get("size"), summary.get("mtime_ns")) != (stat.st_size, stat.st_mtime_ns):
+                data = self.load_day(date)
+                if data is not None:
+                    self._manifest[date] = dict(summarize_day(data), size=stat.st_size,
+                                                mtime_ns=stat.st_mtime_ns)
+
+    def _update_manifest(self, entries=None, removed=(), locations=None):
+        """manifest의 일부 날짜만 갱신 후 저장"""
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            manifest.update(entries or {})
+            for date in removed:
+                manifest.pop(date, None)
+            if self._open_day is not None and self._open_day[0] in removed:
+                self._open_day = None
+            for date, location in (locations or {}).items():
+                if date in manifest:
+                    manifest[date].update(location)
+            self._write_manifest()
+
+    def _write_manifest(self):
+        """manifest 전체 저장 (오늘의 요약도 합쳐서)"""
+        if self._open_day is not None:
+            date, summary = self._open_day
+            self._manifest[date] = dict(self._manifest.get(date, {}), **summary)
+        payload = json.dumps({"version": HISTORY_MANIFEST_VERSION, "days": self._manifest},
+                             ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        write_atomic(self.manifest_path, payload)
+
+    def day_sizes(self):
+        """[(날짜, 바이트 수), ...] - 날짜는 파일 이름(YYYY-MM-DD.json)에서 구함
+
+        묶음에 들어간 날짜는 압축된 크기로 세고, 하루치 로그 파일 크기를 더한다.
+        """
+        log_sizes = self.day_log.sizes()
+        sizes = [(date, size + log_sizes.pop(date, 0)) for date, size in self._loose_day_sizes()]
+        for month in self._bundle_months():
+            try:
+                with zipfile.ZipFile(self.bundle_path(month)) as bundle:
+                    for info in bundle.infolist():
+                        date = parse_day(info.filename[:-len('.json')])
+                        if date is not None:
+                            sizes.append((date, info.compress_size + log_sizes.pop(date, 0)))
+            except (OSError, zipfile.BadZipFile):
+                pass
+        return sizes + list(log_sizes.items())
+
+    def _loose_day_sizes(self):
+        """묶이지 않은 날짜 파일 [(날짜, 바이트 수), ...]"""
+        return [(date, stat.st_size) for date, stat in self._loose_day_stats()]
+
+    def _loose_day_stats(self):
+        """묶이지 않은 날짜 파일 [(날짜, os.stat 결과), ...]"""
+        stats = []
+        with os.scandir(self.history_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json'):
+                    continue
+                date = parse_day(entry.name[:-len('.json')])
+                if date is None:
+                    continue
+                try:
+                    stats.append((date, entry.stat()))
+                except OSError:
+                    pass
+        return stats
+
+    def _bundle_months(self):
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(filename[:-len('.zip')] for filename in os.listdir(self.archive_dir)
+                      if filename.endswith('.zip'))
+
+    def _bundle_layout(self, month):
+        """묶음 안 날짜별 위치 {날짜: {"archive", "offset", "size"}}"""
+        layout = {}
+        try:
+            with zipfile.ZipFile(self.bundle_path(month)) as bundle:
+                for info in bundle.infolist():
+                    layout[info.filename[:-len('.json')]] = {
+                        "archive": f"{month}.zip",
+                        "offset": info.header_offset,
+                        "size": info.compress_size,
+                    }
+        except (OSError, zipfile.BadZipFile):
+            pass
+        return layout
+
+    def archive_months(self, today):
+        """이번 달 이전의 날짜 파일을 월별 묶음으로 옮기고 옮긴 날짜 목록 반환"""
+        current_month = today.isoformat()[:7]
+        by_month = {}
+        for date, _ in self._loose_day_sizes():
+            if date[:7] < current_month:
+                by_month.setdefault(date[:7], []).append(date)
+
+        archived = []
+        for month, dates in sorted(by_month.items()):
+            payloads = {}
+            for date in dates:
+                with open(self.day_path(date), 'rb') as f:
+                    payloads[date] = f.read()
+            self._rewrite_bundle(month, add=payloads)
+            for date in dates:
+                os.remove(self.day_path(date))
+            archived.extend(dates)
+            self._update_manifest(locations=self._bundle_layout(month))
+        return archived
+
+    def delete_days(self, dates):
+        """날짜 목록 삭제 (묶음은 월마다 한 번만 다시 씀)"""
+        archived_months = set(self._bundle_months())
+        by_month = {}
+        for date in dates:
+            try:
+                os.remove(self.day_path(date))
+            except FileNotFoundError:
+                pass
+            if date[:7] in archived_months:
+                by_month.setdefault(date[:7], set()).add(date)
+
+        locations = {}
+        for month, removed in by_month.items():
+            self._rewrite_bundle(month, remove=removed)
+            locations.update(self._bundle_layout(month))
+        self._update_manifest(removed=dates, locations=locations)
+        self.click_log.delete_days(dates)
+        self.day_log.delete_days(dates)
+
+    def _rewrite_bundle(self, month, add=None, remove=()):
+        """월별 묶음을 새로 써서 날짜 추가/제거 (남는 날짜가 없으면 묶음 삭제)"""
+        add = add or {}
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = self.bundle_path(month)
+        tmp_path = path + ".tmp"
+        kept = 0
+
+        with zipfile.ZipFile(tmp_path, 'w', HISTORY_ARCHIVE_COMPRESSION) as out:
+            if os.path.exists(path):
+                with zipfile.ZipFile(path) as old:
+                    for info in old.infolist():
+                        date = info.filename[:-len('.json')]
+                        if date in remove or date in add:
+                            continue
+                        out.writestr(info, old.read(info))
+                        kept += 1
+            for date in sorted(add):
+                out.writestr(f"{date}.json", add[date])
+                kept += 1
+
+        if kept:
+            os.replace(tmp_path, path)
+        else:
+            os.remove(tmp_path)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self):
+        """오늘의 요약을 manifest에 합쳐 씀"""
+        with self._manifest_lock:
+            if self._open_day is not None:
+                self._load_manifest()
+                self._write_manifest()
+
+
+# ============================================================================
+# SQLITE STORE
+# ============================================================================
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date    TEXT PRIMARY KEY,
+    preset  INTEGER NOT NULL DEFAULT 0,
+    logs    TEXT NOT NULL DEFAULT '[]'
+);
+CREATE TABLE IF NOT EXISTS daily_counts (
+    date    TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    name    TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (date, key)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_counts_name ON daily_counts (name, date);
+CREATE TABLE IF NOT EXISTS click_events (
+    date    TEXT NOT NULL,
+    seq     INTEGER NOT NULL,
+    name    TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (date, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_click_events_name ON click_events (name, date);
+CREATE TABLE IF NOT EXISTS day_logs (
+    date    TEXT NOT NULL,
+    seq     INTEGER NOT NULL,
+    line    TEXT NOT NULL,
+    PRIMARY KEY (date, seq)
+);
+CREATE TABLE IF NOT EXISTS day_summaries (
+    date          TEXT PRIMARY KEY,
+    total         INTEGER NOT NULL,
+    active_users  INTEGER NOT NULL,
+    counts        TEXT NOT NULL,
+    recent_logs   TEXT NOT NULL
+);
+"""
+
+
+class SqliteHistoryStore:
+    """SQLite(WAL) 히스토리 저장소
+
+    날짜별 로그, 사용자별 일일 카운트, 클릭 이벤트를 테이블로 나눠 저장하고
+    날짜/사용자 인덱스로 조회한다. sqlite3 연결은 스레드마다 따로 연다
+    (저장 스레드가 쓰고 GUI 스레드가 읽음).
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self.connection().executescript(SQLITE_SCHEMA)
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def save_day(self, date, data, clicks=None, fsync=False, stats=None):
+        """하루치 기록을 한 트랜잭션으로 교체 저장, 대략적인 크기 반환"""
+        conn = self.connection()
+        if fsync:
+            conn.execute("PRAGMA synchronous=FULL")
+        logs = json.dumps(data.get("logs", []), ensure_ascii=False)
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO days (date, preset, logs) VALUES (?, ?, ?)",
+                         (date, data.get("preset", 0), logs))
+            conn.execute("DELETE FROM daily_counts WHERE date = ?", (date,))
+            conn.executemany(
+                "INSERT INTO daily_counts (date, key, name, count) VALUES (?, ?, ?, ?)",
+                [(date, key, user["name"], user["count"])
+                 for key, user in data.get("users", {}).items()]
+            )
+            self._save_summary(conn, date, summarize_day(data))
+            if clicks is not None:
+                conn.execute("DELETE FROM click_events WHERE date = ?", (date,))
+                conn.executemany(
+                    "INSERT INTO click_events (date, seq, name, count) VALUES (?, ?, ?, ?)",
+                    [(date, seq, name, count) for seq, (name, count) in enumerate(clicks, 1)]
+                )
+        if fsync:
+            conn.execute("PRAGMA synchronous=NORMAL")
+        if stats is not None and fsync:
+            stats.add(fsyncs=1)
+        return self._estimate_size(len(logs), len(data.get("users", {})), len(clicks or ()))
+
+    @staticmethod
+    def _estimate_size(log_bytes, user_rows, click_rows):
+        # 행당 대략적인 저장 크기 (날짜 + 이름 + 정수 + 인덱스)
+        return log_bytes + user_rows * 48 + click_rows * 40
+
+    def load_day(self, date):
+        """하루치 기록을 JSON 파일과 같은 형태의 dict로 로드 (없으면 None)"""
+        conn = self.connection()
+        row = conn.execute("SELECT preset, logs FROM days WHERE date = ?", (date,)).fetchone()
+        if row is None:
+            return None
+
+        users = {}
+        for key, name, count in conn.execute(
+                "SELECT key, name, count FROM daily_counts WHERE date = ?", (date,)):
+            users[key] = {"name": name, "count": count}
+        return {"date": date, "preset": row[0], "users": users, "logs": json.loads(row[1])}
+
+    def list_days(self):
+        """저장된 날짜 목록 (최신순)"""
+        rows = self.connection().execute("SELECT date FROM days ORDER BY date DESC")
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _save_summary(conn, date, summary):
+        conn.execute(
+            "INSERT OR REPLACE INTO day_summaries "
+            "(date, total, active_users, counts, recent_logs) VALUES (?, ?, ?, ?, ?)",
+            (date, summary["total"], summary["active_users"],
+             json.dumps(summary["counts"], ensure_ascii=False),
+             json.dumps(summary["recent_logs"], ensure_ascii=False)))
+
+    def day_summaries(self):
+        """[(날짜, 요약), ...] 최신순 - 요약이 없는 날짜(이전 버전 DB)는 한 번 채워 넣음"""
+        conn = self.connection()
+        missing = conn.execute(
+            "SELECT d.date FROM days d LEFT JOIN day_summaries s ON s.date = d.date "
+            "WHERE s.date IS NULL").fetchall()
+        if missing:
+            with conn:
+                for (date,) in missing:
+                    self._save_summary(conn, date, summarize_day(self.load_day(date)))
+
+        rows = conn.execute(
+            "SELECT date, total, active_users, counts, recent_logs "
+            "FROM day_summaries ORDER BY date DESC")
+        return [(date, {"total": total, "active_users": active_users,
+                        "counts": json.loads(counts), "recent_logs": json.loads(recent_logs)})
+                for date, total, active_users, counts, recent_logs in rows]
+
+    def day_clicks(self, date):
+        """하루치 클릭 이벤트 [(이름, 개인 카운트), ...]"""
+        rows = self.connection().execute(
+            "SELECT name, count FROM click_events WHERE date = ? ORDER BY seq", (date,))
+        return rows.fetchall()
+
+    def user_clicks(self, name, start_date, end_date):
+        """기간 내 특정 사용자의 클릭 이벤트 [(date, seq, count), ...]"""
+        rows = self.connection().execute(
+            "SELECT date, seq, count FROM click_events "
+            "WHERE name = ? AND date BETWEEN ? AND ? ORDER BY date, seq",
+            (name, start_date, end_date))
+        return rows.fetchall()
+
+    def append_day_log(self, date, entries, fsync=False, stats=None):
+        """(저널 순번, 로그 항목)들을 하루치 로그에 추가 (이미 있는 순번은 무시), 크기 반환"""
+        conn = self.connection()
+        if fsync:
+            conn.execute("PRAGMA synchronous=FULL")
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO day_logs (date, seq, line) VALUES (?, ?, ?)",
+                ((date, seq, format_log_entry(entry)) for seq, entry in entries))
+        if fsync:
+            conn.execute("PRAGMA synchronous=NORMAL")
+        if stats is not None and fsync:
+            stats.add(fsyncs=1)
+        row = conn.execute("SELECT SUM(length(line)) FROM day_logs WHERE date = ?",
+                           (date,)).fetchone()
+        return row[0] or 0
+
+    def iter_day_log(self, date):
+        """하루 전체 로그 스트리밍 (로그 행이 없는 이전 기록은 days.logs)"""
+        rows = self.connection().execute(
+            "SELECT line FROM day_logs WHERE date = ? ORDER BY seq", (date,))
+        found = False
+        for (line,) in rows:
+            found = True
+            yield line
+        if not found:
+            data = self.load_day(date)
+            if data is not None:
+                yield from data.get("logs", [])
+
+    def day_sizes(self):
+        """[(날짜, 대략적인 바이트 수), ...]"""
+        rows = self.connection().execute(
+            "SELECT d.date, length(d.logs) + "
+            "IFNULL((SELECT SUM(length(l.line)) FROM day_logs l WHERE l.date = d.date), 0), "
+            "(SELECT COUNT(*) FROM daily_counts u WHERE u.date = d.date), "
+            "(SELECT COUNT(*) FROM click_events c WHERE c.date = d.date) "
+            "FROM days d")
+        return [(date, self._estimate_size(log_bytes, users, clicks))
+                for date, log_bytes, users, clicks in rows]
+
+    def archive_months(self, today):
+        """SQLite는 한 파일이라 따로 묶지 않음"""
+        return []
+
+    def delete_days(self, dates):
+        """날짜 목록 삭제 (날짜 인덱스 사용)"""
+        conn = self.connection()
+        with conn:
+            for table in ("days", "daily_counts", "click_events", "day_summaries", "day_logs"):
+                conn.executemany(f"DELETE FROM {table} WHERE date = ?",
+                                 [(date,) for date in dates])
+
+    def import_days(self, source):
+        """다른 저장소(JSON 디렉토리)의 기록 가져오기"""
+        for date in source.list_days():
+            data = source.load_day(date)
+            if data is not None:
+                self.save_day(date, data, source.day_clicks(date) or None)
+                self.append_day_log(date, enumerate(source.iter_day_log(date), 1))
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def open_history_store(data_dir, backend=HISTORY_BACKEND):
+    """설정된 백엔드의 히스토리 저장소 열기"""
+    history_dir = os.path.join(data_dir, "history")
+    if backend != HISTORY_BACKEND_SQLITE:
+        return JsonHistoryStore(history_dir)
+
+    db_path = os.path.join(data_dir, HISTORY_DB_FILE_NAME)
+    is_new = not os.path.exists(db_path)
+    store = SqliteHistoryStore(db_path)
+    if is_new and os.path.isdir(history_dir):
+        # 처음 전환할 때 기존 JSON 히스토리를 한 번 가져옴
+        store.import_days(JsonHistoryStore(history_dir))
+    return store
+
+
+# ============================================================================
+# RETENTION SERVICE
+# ============================================================================
+
+class RetentionService:
+    """히스토리 보관 기간/용량 관리
+
+    날짜는 파일 수정 시간이 아니라 이름(YYYY-MM-DD)에서 구한다. 날짜별 크기를
+    정렬된 인덱스로 들고 있어서 정리할 때 디렉토리를 다시 훑지 않는다.
+    정리는 전용 스레드에서 요청이 있을 때만(시작 시, 날짜 변경 시) 실행되며,
+    먼저 지난 달 기록을 월별 묶음으로 옮긴 뒤 보관 기간/용량을 적용한다.
+    """
+    def __init__(self, store, max_age_days=HISTORY_RETENTION_DAYS, max_bytes=HISTORY_MAX_BYTES):
+        self.store = store
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._dates = []   # 오름차순 날짜 목록
+        self._sizes = {}   # {날짜: 바이트 수}
+        self._loaded = False
+        self._event = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def rebuild(self):
+        """저장소를 한 번 훑어 인덱스 다시 만들기"""
+        sizes = dict(self.store.day_sizes())
+        with self._lock:
+            self._sizes = sizes
+            self._dates = sorted(sizes)
+            self._loaded = True
+
+    def note_saved(self, date, size):
+        """하루치 기록 저장 후 인덱스 갱신 (저장 스레드에서 호출)"""
+        with self._lock:
+            if date not in self._sizes:
+                bisect.insort(self._dates, date)
+            self._sizes[date] = size
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def take_error(self):
+        """마지막 정리 실패 예외를 꺼냄 (없으면 None, 꺼내면 지워짐)"""
+        with self._lock:
+            error, self.last_error = self.last_error, None
+            return error
+
+    def run(self, today=None):
+        """보관 기간이 지났거나 용량 한도를 넘는 날짜 삭제, 삭제한 날짜 목록 반환"""
+        today = today or Date.today()
+        archived = self.store.archive_months(today)
+        if archived or not self._loaded:
+            self.rebuild()
+
+        cutoff = (today - timedelta(days=self.max_age_days)).isoformat()
+        today_str = today.isoformat()
+
+        with self._lock:
+            # 기간 만료: 정렬된 인덱스에서 cutoff 이전 구간
+            expired = self._dates[:bisect.bisect_left(self._dates, cutoff)]
+            remaining = self._dates[len(expired):]
+
+            # 용량 한도: 오래된 날짜부터 (오늘은 제외)
+            if self.max_bytes:
+                total = sum(self._sizes[date] for date in remaining)
+                while total > self.max_bytes and remaining and remaining[0] != today_str:
+                    date = remaining.pop(0)
+                    expired.append(date)
+                    total -= self._sizes[date]
+
+        if not expired:
+            return expired
+
+        self.store.delete_days(expired)
+        with self._lock:
+            for date in expired:
+                index = bisect.bisect_left(self._dates, date)
+                if index < len(self._dates) and self._dates[index] == date:
+                    del self._dates[index]
+                self._sizes.pop(date, None)
+        return expired
+
+    def request(self):
+        """정리 요청 (전용 스레드에서 실행)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="counter-retention", daemon=True)
+            self._thread.start()
+        self._event.set()
+
+    def stop(self):
+        self._stopped = True
+        self._event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            self._event.wait()
+            self._event.clear()
+            if self._stopped:
+                return
+            try:
+                self.run()
+            except Exception as e:
+                with self._lock:
+                    self.last_error = e
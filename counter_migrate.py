@@ -0,0 +1,202 @@
+"""
+Numpad Counter - Data Migration
+이전 형식의 데이터 폴더를 현재 형식(체크포인트 v2 + 프리셋별 파일)으로 한 번에 변환
+
+시작할 때 자동으로 한 번 실행되며, 명령줄에서도 실행할 수 있다.
+    python counter_migrate.py [--dry-run] [데이터 폴더 ...]
+  --dry-run: 파일을 바꾸지 않고 할 일만 출력
+"""
+
+import json
+import os
+import shutil
+import sys
+
+from counter_storage import (PresetStore, write_atomic, write_checkpoint,
+                             CHECKPOINT_FILE_NAME, CHECKPOINT_VERSION, PRESET_DIR_NAME,
+                             PRESET_FORMAT_VERSION)
+
+
+# ============================================================================
+# MIGRATION CONFIGURATION
+# ============================================================================
+DATA_FORMAT_FILE_NAME = "format_version.json"  # 데이터 폴더 형식 버전 기록
+DATA_FORMAT_VERSION = 1          # 1: 체크포인트 v2 + 프리셋별 파일 v2
+LEGACY_BACKUP_DIR_NAME = "legacy"  # 변환이 끝난 이전 파일 보관 폴더
+LEGACY_PRESETS_FILE_NAME = "presets.json"          # 통합 형식 / 3개 배열 형식
+LEGACY_COUNTER_DATA_FILE_NAME = "counter_data.json"  # 배열 형식의 현재 프리셋/로그
+LEGACY_PRESET_COUNT = 3  # 이전 형식은 항상 프리셋 3개
+
+
+def read_format_version(data_dir):
+    """데이터 폴더 형식 버전 (기록이 없으면 0)"""
+    try:
+        with open(os.path.join(data_dir, DATA_FORMAT_FILE_NAME), 'rb') as f:
+            return json.loads(f.read()).get("version", 0)
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def write_format_version(data_dir):
+    payload = json.dumps({"version": DATA_FORMAT_VERSION}).encode('utf-8')
+    write_atomic(os.path.join(data_dir, DATA_FORMAT_FILE_NAME), payload, fsync=True)
+
+
+def read_json(path):
+    """JSON 파일 로드 (없거나 손상되었으면 None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def default_preset(index):
+    return {"name": f"프리셋 {index + 1}", "users": {}, "click_history": []}
+
+
+def convert_preset(index, preset):
+    """이전 프리셋 하나 → 현재 프리셋 (users / user_seats+counters 형식 모두 처리)"""
+    converted = default_preset(index)
+    if not isinstance(preset, dict):
+        return converted
+
+    if "users" in preset:
+        converted["users"] = preset["users"]
+    elif "user_seats" in preset and "counters" in preset:
+        converted["users"] = {
+            key: {"name": user_name, "count": preset["counters"].get(user_name, 0)}
+            for user_name, key in preset["user_seats"].items()
+        }
+    if "name" in preset:
+        converted["name"] = preset["name"]
+    if "click_history" in preset:
+        converted["click_history"] = [tuple(entry) for entry in preset["click_history"]]
+    return converted
+
+
+def read_legacy_state(data_dir):
+    """체크포인트 v1 또는 presets.json(+counter_data.json)에서 상태 읽기
+
+    반환: (프리셋 목록, 체크포인트 내용) 또는 변환할 데이터가 없으면 None
+    """
+    checkpoint = read_json(os.path.join(data_dir, CHECKPOINT_FILE_NAME))
+    if isinstance(checkpoint, dict) and checkpoint.get("version") == CHECKPOINT_VERSION:
+        # 이미 현재 체크포인트가 있으면 남아 있는 presets.json은 오래된 사본
+        return None
+    if isinstance(checkpoint, dict) and checkpoint.get("version") == 1:
+        # 체크포인트 v1: 모든 프리셋이 체크포인트 안에 있음
+        presets = checkpoint.get("presets") or []
+        return ([convert_preset(i, presets[i] if i < len(presets) else None)
+                 for i in range(LEGACY_PRESET_COUNT)],
+                {"current_preset": checkpoint.get("current_preset", 0),
+                 "last_date": checkpoint.get("last_date", ""),
+                 "journal_seq": checkpoint.get("journal_seq", 0),
+                 "logs": checkpoint.get("logs", [])})
+
+    data = read_json(os.path.join(data_dir, LEGACY_PRESETS_FILE_NAME))
+    if isinstance(data, dict) and "presets" in data:
+        # 통합 형식 {"presets": [...], "current_preset", "last_date", "logs"}
+        presets = data["presets"] if isinstance(data["presets"], list) else []
+        state = {"current_preset": data.get("current_preset", 0),
+                 "last_date": data.get("last_date", ""),
+                 "journal_seq": data.get("journal_seq", 0),
+                 "logs": data.get("logs", [])}
+    elif isinstance(data, list):
+        # 3개 배열 형식 (현재 프리셋/로그는 counter_data.json에 따로 있음)
+        presets = data
+        counter_data = read_json(os.path.join(data_dir, LEGACY_COUNTER_DATA_FILE_NAME))
+        if not isinstance(counter_data, dict):
+            counter_data = {}
+        state = {"current_preset": counter_data.get("current_preset", 0),
+                 "last_date": counter_data.get("date", ""),
+                 "journal_seq": 0,
+                 "logs": counter_data.get("logs", [])}
+    else:
+        return None
+
+    return ([convert_preset(i, presets[i] if i < len(presets) else None)
+             for i in range(LEGACY_PRESET_COUNT)], state)
+
+
+def backup_legacy_files(data_dir, dry_run=False, report=None):
+    """변환이 끝난 이전 파일을 legacy 폴더로 이동 (다음 시작부터 읽지 않음)"""
+    backup_dir = os.path.join(data_dir, LEGACY_BACKUP_DIR_NAME)
+    for filename in (LEGACY_PRESETS_FILE_NAME, LEGACY_COUNTER_DATA_FILE_NAME):
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            if report is not None:
+                report(f"{filename} → {LEGACY_BACKUP_DIR_NAME}/{filename} 이동")
+            if dry_run:
+                continue
+            os.makedirs(backup_dir, exist_ok=True)
+            shutil.move(path, os.path.join(backup_dir, filename))
+
+
+def migrate_data_dir(data_dir, force=False, dry_run=False, report=None):
+    """데이터 폴더를 현재 형식으로 변환 (이미 현재 형식이면 아무것도 하지 않음)
+
+    각 단계는 다시 실행해도 안전하다. format_version.json은 마지막에 쓰므로
+    중간에 종료되면 다음 시작 때 처음부터 다시 변환한다.
+    dry_run=True이면 파일을 바꾸지 않고 할 일만 report(메시지)로 알린다.
+
+    반환: 변환을 실행했으면(dry_run이면 실행할 것이면) True
+    """
+    if not force and read_format_version(data_dir) >= DATA_FORMAT_VERSION:
+        return False
+    report = report or (lambda message: None)
+    preset_dir = os.path.join(data_dir, PRESET_DIR_NAME)
+    if not dry_run:
+        os.makedirs(data_dir, exist_ok=True)
+    # 미리보기에서는 프리셋 폴더를 새로 만들지 않음
+    preset_store = PresetStore(preset_dir) if not dry_run or os.path.isdir(preset_dir) else None
+
+    legacy = read_legacy_state(data_dir)
+    if legacy is not None:
+        presets, state = legacy
+        for i, preset in enumerate(presets):
+            report(f"프리셋 {i + 1}: 사용자 {len(preset['users'])}명, "
+                   f"클릭 {len(preset['click_history'])}회 → {PRESET_DIR_NAME}/ 에 저장")
+            if not dry_run:
+                preset["journal_seq"] = state["journal_seq"]
+                preset_store.save(i, preset, fsync=True)
+        report(f"{CHECKPOINT_FILE_NAME} 작성 (현재 프리셋 {state['current_preset'] + 1}, "
+               f"로그 {len(state['logs'])}줄)")
+        if not dry_run:
+            write_checkpoint(os.path.join(data_dir, CHECKPOINT_FILE_NAME), state, fsync=True)
+    elif preset_store is not None:
+        # 이미 프리셋별 파일이 있으면 버전 없는 파일만 현재 형식으로 다시 저장
+        for i in preset_store.indexes():
+            data = preset_store.load_raw(i)
+            if data is not None and data.get("version") != PRESET_FORMAT_VERSION:
+                report(f"프리셋 {i + 1}: 버전 없는 파일을 현재 형식으로 다시 저장")
+                if not dry_run:
+                    preset = convert_preset(i, data)
+                    preset["journal_seq"] = data.get("journal_seq", 0)
+                    preset_store.save(i, preset, fsync=True)
+
+    backup_legacy_files(data_dir, dry_run, report)
+    report(f"{DATA_FORMAT_FILE_NAME} 작성 (v{DATA_FORMAT_VERSION})")
+    if not dry_run:
+        write_format_version(data_dir)
+    return True
+
+
+def main(argv):
+    dry_run = "--dry-run" in argv
+    data_dirs = [arg for arg in argv if not arg.startswith("--")] or ["counter_data"]
+    for data_dir in data_dirs:
+        if not os.path.isdir(data_dir):
+            print(f"{data_dir}: 폴더가 없습니다")
+            continue
+        report = (lambda message, data_dir=data_dir: print(f"{data_dir}: {message}"))
+        if not migrate_data_dir(data_dir, dry_run=dry_run, report=report):
+            print(f"{data_dir}: 이미 현재 형식입니다")
+        elif dry_run:
+            print(f"{data_dir}: 위 작업이 실행됩니다 (--dry-run, 바뀐 파일 없음)")
+        else:
+            print(f"{data_dir}: 현재 형식(v{DATA_FORMAT_VERSION})으로 변환했습니다")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
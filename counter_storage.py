@@ -0,0 +1,647 @@
+"""
+Numpad Counter - Storage Layer
+GUI(PySide6)와 분리된 저장 로직 (직렬화, 저널, 체크포인트, 프리셋별 파일, 백그라운드 저장, 내구성 모드)
+"""
+
+import json
+import os
+import threading
+import time
+
+
+# ============================================================================
+# STORAGE CONFIGURATION
+# ============================================================================
+JOURNAL_FILE_NAME = "journal.jsonl"  # 추가 전용 클릭 저널 파일
+JOURNAL_SEGMENT_PREFIX = "journal-"  # 저장 대기 중인 저널 조각 (journal-<seq>.jsonl)
+SAVE_INTERVAL_MS = 3000              # 변경 사항 전체 저장 최소 간격 (3초)
+CHECKPOINT_FILE_NAME = "checkpoint.json"  # 주기적 압축 체크포인트 (시작 시 우선 로드)
+CHECKPOINT_VERSION = 2                    # 2: 프리셋은 presets/ 폴더에 따로 저장
+PRESET_DIR_NAME = "presets"               # 프리셋별 파일 (presets/preset_<n>.json)
+PRESET_FORMAT_VERSION = 2                 # 2: 사용자 테이블 + 정수 id 클릭 기록
+SERIALIZER = "auto"  # "auto"(orjson, 없으면 json), "orjson", "msgpack", "json"
+STORAGE_STATS_FILE_NAME = "storage_stats.json"  # 모드별 fsync/기록 바이트 누적 통계
+LOG_TEMPLATE_INCREMENT = "{} {}: {} (총 {}회)"  # 클릭 로그 (접두어, 키, 이름, 카운트)
+LOG_PREFIX_INCREMENT = "[+]"                    # 클릭 로그 기본 접두어
+
+# ============================================================================
+# SERIALIZERS
+# ============================================================================
+
+class JsonSerializer:
+    """표준 json 직렬화 (들여쓰기 없음)"""
+    name = "json"
+    extension = ".json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """orjson 직렬화 (결과가 JSON이라 표준 json으로도 읽을 수 있음)"""
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """msgpack 직렬화 (바이너리, .msgpack 파일)"""
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def dumps(self, obj):
+        return self._msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data):
+        return self._msgpack.unpackb(data, raw=False)
+
+
+SERIALIZERS = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+def get_serializer(name=SERIALIZER):
+    """사용할 직렬화기 (선택한 라이브러리가 설치되어 있지 않으면 표준 json)"""
+    candidate = "orjson" if name == "auto" else name
+    try:
+        return SERIALIZERS[candidate]()
+    except (ImportError, KeyError):
+        return JsonSerializer()
+
+
+def get_json_serializer():
+    """JSON 형식을 유지해야 하는 곳(저널, 체크포인트)에 쓸 가장 빠른 직렬화기"""
+    try:
+        return OrjsonSerializer()
+    except ImportError:
+        return JsonSerializer()
+
+
+def encode_preset(preset):
+    """프리셋 → 저장 형식 (사용자 테이블 + [사용자 id, 개인 카운트, ...] 평탄 배열)
+
+    클릭마다 한글 이름을 반복 저장하지 않아 파일 크기가 크게 줄어든다.
+    """
+    encoded = {key: value for key, value in preset.items() if key != "click_history"}
+    history = preset.get("click_history", [])
+    if hasattr(history, "user_ids"):
+        # ClickHistory: 이미 사용자 테이블과 번호 열로 되어 있음
+        user_table = list(history.names)
+        clicks = [value for pair in zip(history.user_ids, history.counts) for value in pair]
+        # 클릭 시각은 앞 클릭과의 차이(ns)로 저장 (첫 값만 절대 시각)
+        times = history.times
+        if any(times):
+            encoded["times"] = [times[0]] + [times[i] - times[i - 1] for i in range(1, len(times))]
+    else:
+        user_table = []
+        user_ids = {}
+        clicks = []
+        for name, count in history:
+            user_id = user_ids.get(name)
+            if user_id is None:
+                user_id = user_ids[name] = len(user_table)
+                user_table.append(name)
+            clicks.append(user_id)
+            clicks.append(count)
+
+    encoded["version"] = PRESET_FORMAT_VERSION
+    encoded["user_table"] = user_table
+    encoded["clicks"] = clicks
+    return encoded
+
+
+def decode_preset(data):
+    """저장 형식 → 프리셋 (현재 버전이 아니면 None, 이전 형식은 counter_migrate에서 변환)"""
+    if data.get("version") != PRESET_FORMAT_VERSION:
+        return None
+
+    user_table = data.pop("user_table", [])
+    clicks = data.pop("clicks", [])
+    data.pop("version")
+    data["click_history"] = [(user_table[clicks[i]], clicks[i + 1])
+                             for i in range(0, len(clicks), 2)]
+    deltas = data.pop("times", None)
+    if deltas:
+        # 차이값 → 절대 시각 (ns)
+        times = []
+        current = 0
+        for delta in deltas:
+            current += delta
+            times.append(current)
+        data["click_times"] = times
+    return data
+
+
+# 내구성 모드 (스테이션마다 지연 시간/안전성 선택)
+DURABILITY_STRICT = "strict"      # 변경마다 저널 fsync + 스냅샷 임시 파일 fsync 후 교체
+DURABILITY_INTERVAL = "interval"  # SAVE_INTERVAL_MS마다 스냅샷을 fsync (그룹 커밋)
+DURABILITY_RELAXED = "relaxed"    # 종료/날짜 변경 시에만 스냅샷 저장, fsync 없음
+DURABILITY_MODE = DURABILITY_INTERVAL
+
+
+# ============================================================================
+# STORAGE STATISTICS
+# ============================================================================
+
+class StorageStats:
+    """저장 계층이 실제로 발생시킨 fsync 횟수와 기록 바이트 수
+
+    GUI 스레드(저널)와 저장 스레드(스냅샷)가 함께 갱신하므로 잠금을 사용한다.
+    """
+    FIELDS = ("fsyncs", "bytes_written", "journal_records", "snapshots")
+
+    def __init__(self, mode):
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, value in deltas.items():
+                self.counts[name] += value
+
+    def save(self, path):
+        """모드별 누적 통계를 파일에 합산 저장"""
+        totals = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    totals = json.load(f)
+            except (OSError, ValueError):
+                totals = {}
+
+        with self._lock:
+            counts = dict(self.counts)
+        mode_totals = totals.setdefault(self.mode, {})
+        for name, value in counts.items():
+            mode_totals[name] = mode_totals.get(name, 0) + value
+
+        write_json(path, totals)
+
+
+def write_json(path, data, fsync=False, stats=None):
+    """JSON 파일 저장 (사람이 읽을 수 있는 기존 형식 유지), 기록한 바이트 수 반환"""
+    payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return write_atomic(path, payload, fsync, stats)
+
+
+def write_atomic(path, payload, fsync=False, stats=None):
+    """임시 파일에 쓴 뒤 교체 (쓰다 만 파일이 남지 않음), 기록한 바이트 수 반환"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    if stats is not None:
+        stats.add(bytes_written=len(payload), fsyncs=1 if fsync else 0)
+    return len(payload)
+
+
+# ============================================================================
+# CHECKPOINT
+# ============================================================================
+
+def write_checkpoint(path, data, fsync=False, stats=None):
+    """체크포인트 저장 (들여쓰기 없는 압축 JSON, journal_seq 포함)
+
+    프리셋 내용은 PresetStore가 따로 저장하므로 체크포인트에는
+    현재 프리셋 번호, 날짜, 최근 로그, 반영된 저널 순번만 담긴다.
+    """
+    checkpoint = dict(data, version=CHECKPOINT_VERSION)
+    payload = get_json_serializer().dumps(checkpoint)
+    write_atomic(path, payload, fsync, stats)
+
+
+def read_checkpoint(path):
+    """체크포인트 로드 (없거나 손상/다른 버전이면 None, 이전 버전은 counter_migrate에서 변환)"""
+    try:
+        with open(path, 'rb') as f:
+            checkpoint = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+    return checkpoint
+
+
+# ============================================================================
+# PRESET STORE
+# ============================================================================
+
+class PresetStore:
+    """프리셋별 파일 저장소 (presets/preset_<n>.json 또는 .msgpack)
+
+    프리셋마다 파일이 따로 있어 처음 전환할 때만 읽고, 바뀐 프리셋만 다시 쓴다.
+    각 파일에는 형식 버전과 자신이 반영한 저널 순번(journal_seq)이 함께 저장된다.
+    """
+    def __init__(self, preset_dir, serializer=None):
+        self.preset_dir = preset_dir
+        self.serializer = serializer or get_serializer()
+        os.makedirs(preset_dir, exist_ok=True)
+
+    def path(self, index, extension=None):
+        return os.path.join(self.preset_dir, f"preset_{index}{extension or self.serializer.extension}")
+
+    def indexes(self):
+        """파일이 있는 프리셋 번호 목록 (오름차순)"""
+        indexes = set()
+        for filename in os.listdir(self.preset_dir):
+            stem, extension = os.path.splitext(filename)
+            if stem.startswith("preset_") and extension in (".json", ".msgpack"):
+                try:
+                    indexes.add(int(stem[len("preset_"):]))
+                except ValueError:
+                    continue
+        return sorted(indexes)
+
+    def _readers(self):
+        """읽기 순서: 현재 직렬화기 형식 먼저, 그다음 다른 형식"""
+        readers = [self.serializer]
+        for serializer_class in (JsonSerializer, MsgpackSerializer):
+            if serializer_class.extension != self.serializer.extension:
+                try:
+                    readers.append(serializer_class())
+                except ImportError:
+                    pass
+        return readers
+
+    def load_raw(self, index):
+        """프리셋 파일 내용 그대로 로드 (없거나 손상되었으면 None)"""
+        for reader in self._readers():
+            try:
+                with open(self.path(index, reader.extension), 'rb') as f:
+                    data = reader.loads(f.read())
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError):
+                return None
+            return data if isinstance(data, dict) else None
+        return None
+
+    def load(self, index):
+        """프리셋 로드 (없거나 손상되었거나 현재 형식이 아니면 None)"""
+        data = self.load_raw(index)
+        return decode_preset(data) if data is not None else None
+
+    def save(self, index, data, fsync=False, stats=None):
+        payload = self.serializer.dumps(encode_preset(data))
+        size = write_atomic(self.path(index), payload, fsync, stats)
+        # 직렬화기를 바꾼 경우 이전 형식 파일이 다시 읽히지 않도록 삭제
+        for reader in self._readers()[1:]:
+            try:
+                os.remove(self.path(index, reader.extension))
+            except FileNotFoundError:
+                pass
+        return size
+
+
+# ============================================================================
+# CLICK JOURNAL
+# ============================================================================
+
+class ClickJournal:
+    """추가 전용(append-only) 클릭 저널
+
+    증가/취소/등록/초기화 등 상태 변경마다 한 줄짜리 JSON 레코드를 덧붙인다.
+    presets.json과 일자별 히스토리 파일은 스냅샷 저장 시에만 전체 저장되므로
+    클릭당 쓰기 비용은 그날의 클릭 수와 무관하게 일정하다.
+
+    스냅샷을 뜰 때 현재 저널 파일을 journal-<seq>.jsonl 조각으로 넘기고(rotate),
+    저장 스레드가 스냅샷을 다 쓴 뒤 그 순번까지의 조각을 지운다.
+    fsync_each=True(strict 모드)이면 레코드마다 디스크까지 동기화한다.
+    """
+    def __init__(self, path, fsync_each=False, stats=None):
+        self.path = path
+        self.dir = os.path.dirname(path)
+        self.encode = get_json_serializer().dumps
+        self.fsync_each = fsync_each
+        self.stats = stats
+        self.seq = 0        # 마지막으로 부여한 레코드 순번 (저장 후에도 계속 증가)
+        self._file = None
+
+    def segment_files(self):
+        """저장 대기 중인 저널 조각 목록 (순번 오름차순)"""
+        segments = []
+        for filename in os.listdir(self.dir or "."):
+            if filename.startswith(JOURNAL_SEGMENT_PREFIX) and filename.endswith(".jsonl"):
+                try:
+                    seq = int(filename[len(JOURNAL_SEGMENT_PREFIX):-len(".jsonl")])
+                except ValueError:
+                    continue
+                segments.append((seq, os.path.join(self.dir, filename)))
+        segments.sort()
+        return segments
+
+    def load(self, after_seq=0):
+        """저널 레코드 읽기 (조각 + 현재 파일, after_seq 이후 레코드만)"""
+        records = []
+        self.seq = max(self.seq, after_seq)
+        paths = []
+        for segment_seq, path in self.segment_files():
+            if segment_seq <= after_seq:
+                # 체크포인트에 이미 반영된 조각 (삭제 전에 종료됨)
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            paths.append(path)
+        if os.path.exists(self.path):
+            paths.append(self.path)
+
+        for path in paths:
+            self._read_file(path, after_seq, records)
+        return records
+
+    def _read_file(self, path, after_seq, records):
+        """저널 파일 하나 읽기 (깨진 줄은 무시)"""
+        valid_size = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 기록 도중 종료되어 잘린 마지막 줄
+                    break
+                valid_size += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                seq = record.get("seq", 0)
+                if seq > after_seq:
+                    records.append(record)
+                self.seq = max(self.seq, seq)
+
+        # 잘린 줄 뒤에 새 레코드가 이어 붙지 않도록 정리
+        if valid_size != os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(valid_size)
+
+    def append(self, op, **fields):
+        """레코드 한 줄 추가 후 순번 반환"""
+        self.seq += 1
+        record = {"seq": self.seq, "op": op}
+        record.update(fields)
+
+        line = self.encode(record) + b"\n"
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(line)
+        self._file.flush()
+        if self.fsync_each:
+            os.fsync(self._file.fileno())
+
+        if self.stats is not None:
+            self.stats.add(journal_records=1, bytes_written=len(line),
+                           fsyncs=1 if self.fsync_each else 0)
+        return self.seq
+
+    def rotate(self):
+        """현재 저널 파일을 조각으로 넘기기 (스냅샷 직전, GUI 스레드에서 호출)"""
+        self.close()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        segment = os.path.join(self.dir, f"{JOURNAL_SEGMENT_PREFIX}{self.seq:010d}.jsonl")
+        os.replace(self.path, segment)
+
+    def discard_through(self, seq):
+        """스냅샷에 반영된 순번까지의 조각 삭제 (저장 스레드에서 호출)"""
+        for segment_seq, path in self.segment_files():
+            if segment_seq > seq:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def log_entries(self, through_seq):
+        """through_seq까지의 조각에 담긴 (순번, 로그 항목) 스트리밍 (저장 스레드에서 호출)
+
+        조각은 스냅샷이 끝나면 지워지므로, 그 전에 하루치 로그 파일로 옮길 때 사용한다.
+        """
+        for segment_seq, path in self.segment_files():
+            if segment_seq > through_seq:
+                break
+            try:
+                with open(path, 'rb') as f:
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        entry = journal_log_entry(record)
+                        if entry is not None:
+                            yield record.get("seq", 0), entry
+            except OSError:
+                continue
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ============================================================================
+# LOG ENTRIES
+# ============================================================================
+# 로그는 (time_ns, 템플릿, 인자) 튜플로 들고 있다가 화면/파일에 쓸 때만 문자열로 만든다.
+# 이전 버전의 체크포인트/저널에 남은 "[HH:MM:SS] ..." 문자열도 그대로 항목으로 쓸 수 있다.
+
+def format_log_entry(entry):
+    """로그 항목 → '[HH:MM:SS] 메시지' 문자열"""
+    if isinstance(entry, str):
+        return entry
+    time_ns, template, args = entry
+    timestamp = time.strftime("%H:%M:%S", time.localtime(time_ns // 1_000_000_000))
+    return f"[{timestamp}] {template.format(*args) if args else template}"
+
+
+def journal_log_entry(record):
+    """저널 레코드의 로그 항목 (없으면 None)
+
+    클릭 레코드는 로그를 따로 싣지 않고 시각/키/이름/카운트 필드에서 만든다.
+    """
+    log = record.get("log")
+    if log is None:
+        if record.get("op") != "inc" or "t" not in record:
+            return None
+        return (record["t"], LOG_TEMPLATE_INCREMENT,
+                (record.get("pre", LOG_PREFIX_INCREMENT), record["k"], record["n"], record["c"]))
+    return decode_log_entry(log)
+
+
+def decode_log_entry(log):
+    """저장된 로그 항목(JSON 배열 또는 이전 형식 문자열) → 로그 항목"""
+    if isinstance(log, str):
+        return log
+    return (log[0], log[1], tuple(log[2]))
+
+
+def apply_journal_record(preset, record):
+    """저널 레코드 하나를 해당 프리셋 데이터(dict)에 반영 (시작 시 재생용)
+
+    프리셋 전환("preset")과 로그는 호출하는 쪽에서 처리한다.
+    """
+    op = record.get("op")
+    users = preset.setdefault("users", {})
+    history = preset.setdefault("click_history", [])
+    key = record.get("k")
+
+    if op == "inc":
+        if key in users:
+            users[key]["count"] = record["c"]
+        history.append((record["n"], record["c"]), record.get("t", 0))
+    elif op == "undo":
+        # k가 None이면 사용자 없이 클릭 기록만 되돌린 취소
+        if history:
+            history.pop()
+        if key in users:
+            users[key]["count"] = record["c"]
+    elif op == "reg":
+        users[key] = {"name": record["n"], "count": 0, "order": record.get("o", 0)}
+    elif op == "mod":
+        if key in users:
+            users[key]["name"] = record["n"]
+            users[key]["count"] = 0
+    elif op == "del":
+        users.pop(key, None)
+    elif op == "reset":
+        for user in users.values():
+            user["count"] = 0
+        history.clear()
+    elif op == "set":
+        # 취소로 되살린 사용자 (이름, 카운트, 등록 순서 전체)
+        users[key] = {"name": record["n"], "count": record["c"], "order": record.get("o", 0)}
+    elif op == "restore":
+        # 초기화 취소: 카운트와 클릭 기록(사용자 테이블 + [번호, 카운트, ...]) 복원
+        for user_key, count in record["u"].items():
+            if user_key in users:
+                users[user_key]["count"] = count
+        table, clicks = record["t"], record["h"]
+        history.clear()
+        history.extend([(table[clicks[i]], clicks[i + 1]) for i in range(0, len(clicks), 2)],
+                       record.get("ts"))
+
+
+# ============================================================================
+# BACKGROUND WRITER
+# ============================================================================
+
+class SnapshotJob:
+    """저장 스레드에 넘기는 스냅샷 한 번 (write(changed_presets, checkpoint, history_data, clicks))
+
+    스냅샷에는 마지막 스냅샷 이후 바뀐 프리셋만 들어 있다. 그래서 쓰지 못한
+    이전 스냅샷(대기 중에 대체되었거나 실패한 것)의 프리셋은 merge_from으로
+    넘겨받아야 한다. 그렇지 않으면 체크포인트가 앞서 나가면서 그 프리셋의
+    저널 조각이 지워져 클릭이 사라진다.
+    """
+    def __init__(self, write, changed_presets, checkpoint, history_data=None, clicks=None):
+        self.write = write
+        self.changed_presets = changed_presets
+        self.checkpoint = checkpoint
+        self.history_data = history_data
+        self.clicks = clicks
+
+    def merge_from(self, older):
+        """이전 스냅샷에만 있는 프리셋을 가져옴 (같은 프리셋은 이번 것이 최신)"""
+        for index, preset in older.changed_presets.items():
+            self.changed_presets.setdefault(index, preset)
+        if self.clicks is None:
+            self.clicks = older.clicks
+
+    def __call__(self):
+        self.write(self.changed_presets, self.checkpoint, self.history_data, self.clicks)
+
+
+class BackgroundWriter:
+    """스냅샷 저장 전용 스레드
+
+    GUI 스레드는 저장 작업(SnapshotJob)을 넘기기만 하고 바로 돌아간다.
+    아직 시작하지 않은 작업이 있는데 새 작업이 오면 최신 것 하나로 합친다.
+    실패한 작업의 프리셋은 다음 작업에 합쳐 다시 쓴다.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._job = None
+        self._failed = None  # 마지막으로 실패한 작업 (다음 작업에 합침)
+        self._busy = False
+        self._stopped = False
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name="counter-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        """저장 작업 등록 (대기 중인 이전 작업과 실패한 작업은 새 작업에 합쳐짐)"""
+        with self._cond:
+            # 최신 것부터 합침 (같은 프리셋은 더 최근 복사본이 남음)
+            for older in (self._job, self._failed):
+                if older is not None:
+                    job.merge_from(older)
+            self._failed = None
+            self._job = job
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """대기 중인 작업과 진행 중인 작업이 끝날 때까지 대기"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._job is None and not self._busy, timeout)
+
+    def take_error(self):
+        """마지막 저장 실패 예외를 꺼냄 (없으면 None, 꺼내면 지워짐)"""
+        with self._cond:
+            error, self.last_error = self.last_error, None
+            return error
+
+    def stop(self):
+        """남은 작업을 모두 저장하고 스레드 종료"""
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._job is not None or self._stopped)
+                if self._job is None:
+                    return
+                job, self._job = self._job, None
+                self._busy = True
+            try:
+                job()
+            except Exception as e:
+                with self._cond:
+                    self.last_error = e
+                    # 그 사이에 들어온 작업이 있으면 바로 합치고, 없으면 다음 작업을 기다림
+                    if self._job is not None:
+                        self._job.merge_from(job)
+                    else:
+                        self._failed = job
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,78 @@
+"""
+테스트 공통 도구 (Qt 없이 CounterEngine + 저장 계층을 임시 폴더에서 사용)
+"""
+
+import functools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from counter_engine import CounterEngine
+from counter_storage import (ClickJournal, PresetStore, SnapshotJob, read_checkpoint,
+                             write_checkpoint, CHECKPOINT_FILE_NAME, JOURNAL_FILE_NAME,
+                             PRESET_DIR_NAME)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return str(tmp_path)
+
+
+@pytest.fixture
+def open_engine(data_dir):
+    """data_dir에서 엔진 열기 (앱 시작과 같은 순서: 체크포인트 → 저널 재생)"""
+    journals = []
+
+    def open_engine():
+        preset_store = PresetStore(os.path.join(data_dir, PRESET_DIR_NAME))
+        journal = ClickJournal(os.path.join(data_dir, JOURNAL_FILE_NAME))
+        journals.append(journal)
+        engine = CounterEngine(preset_store, journal)
+        checkpoint = read_checkpoint(os.path.join(data_dir, CHECKPOINT_FILE_NAME))
+        journal_seq = checkpoint.get("journal_seq", 0) if checkpoint is not None else 0
+        engine.load(checkpoint, journal.load(journal_seq))
+        return engine
+
+    yield open_engine
+    for journal in journals:
+        journal.close()
+
+
+def write_snapshot(data_dir, engine, changed_presets, checkpoint, history_data=None, clicks=None):
+    """CounterApp.write_snapshot의 저장 순서 (프리셋 파일 → 체크포인트 → 저널 조각 삭제)"""
+    for index, preset in changed_presets.items():
+        engine.preset_store.save(index, preset)
+    write_checkpoint(os.path.join(data_dir, CHECKPOINT_FILE_NAME), checkpoint)
+    engine.journal.discard_through(checkpoint["journal_seq"])
+
+
+@pytest.fixture
+def take_snapshot(data_dir):
+    """CounterApp.save_data처럼 저널을 넘기고 스냅샷을 떠서 SnapshotJob 반환
+
+    write를 넘기면 기본 저장 순서 대신 그 함수로 쓴다 (중간 종료 흉내 등).
+    """
+    def take_snapshot(engine, write=None):
+        engine.dirty = False
+        engine.journal.rotate()
+        changed_presets, checkpoint = engine.snapshot_presets()
+        write = write or functools.partial(write_snapshot, data_dir, engine)
+        return SnapshotJob(write, changed_presets, checkpoint)
+
+    return take_snapshot
+
+
+@pytest.fixture
+def preset_state():
+    """비교용 프리셋 상태 {번호: (사용자, 클릭 기록)} (로드된 프리셋 전체)"""
+    def preset_state(engine):
+        for index in range(len(engine.presets)):
+            engine.ensure_preset(index)
+        return {index: ({key: (user["name"], user["count"]) for key, user in preset["users"].items()},
+                         list(preset["click_history"].events()))
+                for index, preset in enumerate(engine.presets)}
+
+    return preset_state
@@ -0,0 +1,117 @@
+"""
+월별 클릭 이벤트 파일(ClickEventLog) 테스트 (mmap 이진 탐색 범위 조회)
+"""
+
+import mmap
+import os
+import threading
+
+from counter_history import ClickEventLog, CLICK_RECORD
+
+
+def clicks_of(*names):
+    """이름 순서대로 클릭한 하루치 [(이름, 개인 카운트), ...]"""
+    counts = {}
+    clicks = []
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+        clicks.append((name, counts[name]))
+    return clicks
+
+
+def test_range_query_crosses_month_boundary(data_dir):
+    log = ClickEventLog(os.path.join(data_dir, "clicks"))
+    log.save_day("2025-01-30", clicks_of("홍길동", "김철수"))
+    log.save_day("2025-01-31", clicks_of("홍길동", "홍길동"))
+    log.save_day("2025-02-01", clicks_of("김철수", "홍길동"))
+    log.save_day("2025-02-02", clicks_of("홍길동"))
+    log.save_day("2025-03-01", clicks_of("홍길동"))
+
+    assert log.months() == ["2025-01", "2025-02", "2025-03"]
+    assert log.user_clicks("홍길동", "2025-01-31", "2025-02-01") == [
+        ("2025-01-31", 1, 1), ("2025-01-31", 2, 2), ("2025-02-01", 2, 1)]
+    assert log.user_clicks("김철수", "2025-01-01", "2025-12-31") == [
+        ("2025-01-30", 2, 1), ("2025-02-01", 1, 1)]
+    assert log.user_clicks("이영희", "2025-01-01", "2025-12-31") == []
+    assert log.day_clicks("2025-02-01") == clicks_of("김철수", "홍길동")
+
+
+def test_empty_and_torn_month_files(data_dir):
+    log = ClickEventLog(os.path.join(data_dir, "clicks"))
+    # 빈 파일: 조회는 비어 있고 그 뒤 저장도 가능
+    open(log.month_path("2025-01"), 'wb').close()
+    assert log.day_clicks("2025-01-05") == []
+    assert log.user_clicks("홍길동", "2025-01-01", "2025-01-31") == []
+    log.save_day("2025-01-05", clicks_of("홍길동"))
+    assert log.day_clicks("2025-01-05") == clicks_of("홍길동")
+
+    # 레코드 크기의 배수가 아닌 파일 (기록 도중 종료): 잘린 레코드는 무시
+    log.save_day("2025-01-06", clicks_of("홍길동", "김철수"))
+    path = log.month_path("2025-01")
+    with open(path, 'ab') as f:
+        f.write(b"\x01" * (CLICK_RECORD.size - 3))
+    assert log.day_clicks("2025-01-06") == clicks_of("홍길동", "김철수")
+    assert len(log.user_clicks("홍길동", "2025-01-01", "2025-01-31")) == 2
+
+    # 마지막 날짜를 다시 쓰면 잘린 꼬리도 정리됨
+    log.save_day("2025-01-06", clicks_of("홍길동", "김철수", "김철수"))
+    assert os.path.getsize(path) % CLICK_RECORD.size == 0
+    assert log.day_clicks("2025-01-06") == clicks_of("홍길동", "김철수", "김철수")
+
+    # 지난 날짜를 다시 써도 (앞뒤 구간 이어 붙이기) 다른 날짜는 그대로
+    with open(path, 'ab') as f:
+        f.write(b"\x01" * 5)
+    log.save_day("2025-01-05", clicks_of("홍길동", "홍길동"))
+    assert os.path.getsize(path) % CLICK_RECORD.size == 0
+    assert log.day_clicks("2025-01-05") == clicks_of("홍길동", "홍길동")
+    assert log.day_clicks("2025-01-06") == clicks_of("홍길동", "김철수", "김철수")
+
+
+def test_append_while_reading(data_dir):
+    log = ClickEventLog(os.path.join(data_dir, "clicks"))
+    log.save_day("2025-01-31", clicks_of("홍길동", "홍길동"))
+    day = clicks_of(*["홍길동"] * 300)
+    errors = []
+    done = threading.Event()
+
+    def write():
+        try:
+            for n in range(1, len(day) + 1):
+                log.save_day("2025-02-01", day[:n])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    reads = 0
+    while not done.is_set() or reads == 0:
+        result = log.user_clicks("홍길동", "2025-01-01", "2025-02-28")
+        # 읽는 동안 덧붙여도 항상 어느 한 시점의 완전한 상태만 보임
+        assert result[:2] == [("2025-01-31", 1, 1), ("2025-01-31", 2, 2)]
+        today = result[2:]
+        assert today == [("2025-02-01", seq, seq) for seq in range(1, len(today) + 1)]
+        reads += 1
+    writer.join()
+
+    assert not errors
+    assert log.day_clicks("2025-02-01") == day
+
+
+def test_append_while_mapping_is_open(data_dir):
+    log = ClickEventLog(os.path.join(data_dir, "clicks"))
+    log.save_day("2025-02-01", clicks_of("홍길동", "김철수"))
+
+    # 다른 곳에서 월 파일을 매핑해 둔 채로 같은 날짜에 덧붙임
+    with open(log.month_path("2025-02"), 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            log.save_day("2025-02-01", clicks_of("홍길동", "김철수", "홍길동"))
+            log.save_day("2025-02-02", clicks_of("김철수"))
+            # 열려 있던 매핑은 이전 길이 그대로 읽힘
+            assert len(mapped) == 2 * CLICK_RECORD.size
+            assert CLICK_RECORD.unpack_from(mapped, 0)[3] == 1
+
+    assert log.day_clicks("2025-02-01") == clicks_of("홍길동", "김철수", "홍길동")
+    assert log.user_clicks("김철수", "2025-02-01", "2025-02-02") == [
+        ("2025-02-01", 2, 1), ("2025-02-02", 1, 1)]
@@ -0,0 +1,44 @@
+"""
+일자별 히스토리 manifest 테스트 (오늘의 요약은 날짜 변경/종료 때만 manifest에 씀)
+"""
+
+import os
+
+from counter_history import JsonHistoryStore
+
+
+def day_data(date, counts):
+    return {"date": date, "preset": 0,
+            "users": {str(i): {"name": name, "count": count}
+                      for i, (name, count) in enumerate(counts.items())},
+            "logs": [f"[{date}] 로그"]}
+
+
+def totals(store):
+    return {date: summary["total"] for date, summary in store.day_summaries()}
+
+
+def test_saving_today_does_not_rewrite_manifest(data_dir):
+    store = JsonHistoryStore(os.path.join(data_dir, "history"))
+    store.save_day("2025-03-01", day_data("2025-03-01", {"홍길동": 3}))
+    store.save_day("2025-03-02", day_data("2025-03-02", {"홍길동": 1}))  # 날짜 변경 → 3/1 기록
+    mtime = os.stat(store.manifest_path).st_mtime_ns
+
+    for count in range(2, 10):
+        store.save_day("2025-03-02", day_data("2025-03-02", {"홍길동": count}))
+    assert os.stat(store.manifest_path).st_mtime_ns == mtime
+    assert totals(store) == {"2025-03-01": 3, "2025-03-02": 9}
+
+    store.close()
+    assert totals(JsonHistoryStore(store.history_dir)) == {"2025-03-01": 3, "2025-03-02": 9}
+
+
+def test_summary_missing_after_crash_is_rebuilt(data_dir):
+    store = JsonHistoryStore(os.path.join(data_dir, "history"))
+    store.save_day("2025-03-01", day_data("2025-03-01", {"홍길동": 3}))
+    store.save_day("2025-03-02", day_data("2025-03-02", {"홍길동": 1, "김철수": 2}))
+    store.save_day("2025-03-02", day_data("2025-03-02", {"홍길동": 4, "김철수": 2}))
+    # close 없이 종료: manifest에는 3/1만 있음
+
+    reopened = JsonHistoryStore(store.history_dir)
+    assert totals(reopened) == {"2025-03-01": 3, "2025-03-02": 6}
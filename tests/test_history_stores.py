@@ -0,0 +1,137 @@
+"""
+JSON / SQLite 히스토리 저장소 공통 테스트 (같은 데이터에 같은 결과, 스레드 동시 사용)
+"""
+
+import os
+import threading
+from datetime import date as Date, timedelta
+
+import pytest
+
+from counter_history import JsonHistoryStore, RetentionService, SqliteHistoryStore
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, data_dir):
+    if request.param == "json":
+        store = JsonHistoryStore(os.path.join(data_dir, "history"))
+    else:
+        store = SqliteHistoryStore(os.path.join(data_dir, "history.sqlite3"))
+    yield store
+    store.close()
+
+
+def day_data(date, counts):
+    return {"date": date, "preset": 1,
+            "users": {key: {"name": name, "count": count}
+                      for key, (name, count) in counts.items()},
+            "logs": [f"[{date}] {name} {count}회" for name, count in counts.values()]}
+
+
+DAYS = {
+    "2025-01-31": {"7": ("홍길동", 2), "8": ("김철수", 1)},
+    "2025-02-01": {"7": ("홍길동", 1), "8": ("김철수", 0)},
+    "2025-02-02": {"9": ("이영희", 3)},
+}
+CLICKS = {
+    "2025-01-31": [("홍길동", 1), ("김철수", 1), ("홍길동", 2)],
+    "2025-02-01": [("홍길동", 1)],
+}
+
+
+def fill(store):
+    for date, counts in DAYS.items():
+        store.save_day(date, day_data(date, counts), CLICKS.get(date))
+
+
+def test_save_and_load_days(store):
+    fill(store)
+    # 같은 날짜를 다시 저장하면 교체됨
+    store.save_day("2025-02-02", day_data("2025-02-02", {"9": ("이영희", 4)}))
+
+    assert store.list_days() == ["2025-02-02", "2025-02-01", "2025-01-31"]
+    assert store.load_day("2025-01-31") == day_data("2025-01-31", DAYS["2025-01-31"])
+    assert store.load_day("2025-02-02")["users"] == {"9": {"name": "이영희", "count": 4}}
+    assert store.load_day("2025-03-01") is None
+
+    summaries = {date: (summary["total"], summary["active_users"], summary["counts"])
+                 for date, summary in store.day_summaries()}
+    assert summaries == {
+        "2025-02-02": (4, 1, {"이영희": 4}),
+        "2025-02-01": (1, 1, {"홍길동": 1, "김철수": 0}),
+        "2025-01-31": (3, 2, {"홍길동": 2, "김철수": 1}),
+    }
+
+
+def test_click_range_and_day_logs(store):
+    fill(store)
+    assert store.day_clicks("2025-01-31") == CLICKS["2025-01-31"]
+    assert [tuple(row) for row in store.user_clicks("홍길동", "2025-01-01", "2025-02-28")] == [
+        ("2025-01-31", 1, 1), ("2025-01-31", 3, 2), ("2025-02-01", 1, 1)]
+    assert list(store.user_clicks("홍길동", "2025-02-02", "2025-02-28")) == []
+
+    # 하루치 로그: 이미 기록된 순번은 다시 추가되지 않음
+    store.append_day_log("2025-02-01", [(1, "[+] 첫 클릭"), (2, "[+] 둘째 클릭")])
+    store.append_day_log("2025-02-01", [(2, "[+] 둘째 클릭"), (3, "[취소] 둘째 클릭")])
+    assert list(store.iter_day_log("2025-02-01")) == ["[+] 첫 클릭", "[+] 둘째 클릭", "[취소] 둘째 클릭"]
+    # 로그 파일이 없는 날짜는 날짜 기록의 로그
+    assert list(store.iter_day_log("2025-02-02")) == ["[2025-02-02] 이영희 3회"]
+
+
+def test_delete_days(store):
+    fill(store)
+    store.delete_days(["2025-01-31", "2025-02-02"])
+    assert store.list_days() == ["2025-02-01"]
+    assert store.load_day("2025-01-31") is None
+    assert store.day_clicks("2025-01-31") == []
+    assert [date for date, _ in store.day_summaries()] == ["2025-02-01"]
+    assert sorted(date for date, _ in store.day_sizes()) == ["2025-02-01"]
+
+
+def test_retention_and_readers_run_concurrently(store):
+    today = Date(2025, 3, 15)
+    old = [(today - timedelta(days=100 + i)).isoformat() for i in range(20)]
+    recent = [(today - timedelta(days=1 + i)).isoformat() for i in range(40)]
+    for date in old + recent:
+        store.save_day(date, day_data(date, {"7": ("홍길동", 1)}), [("홍길동", 1)])
+
+    retention = RetentionService(store, max_age_days=90)
+    errors = []
+    stop = threading.Event()
+
+    def guarded(func):
+        def run():
+            try:
+                func()
+            except Exception as e:
+                errors.append(e)
+        return run
+
+    def write_today():
+        # 저장 스레드: 오늘 기록을 계속 다시 씀
+        for count in range(1, 101):
+            store.save_day(today.isoformat(), day_data(today.isoformat(), {"7": ("홍길동", count)}))
+
+    def read():
+        # GUI 스레드: 일자별 로그 창이 읽는 것들
+        while not stop.is_set():
+            summaries = dict(store.day_summaries())
+            for date in recent[:5]:
+                assert store.load_day(date) is not None
+                assert date in summaries
+
+    threads = [threading.Thread(target=guarded(write_today)),
+               threading.Thread(target=guarded(lambda: retention.run(today))),
+               threading.Thread(target=guarded(read))]
+    for thread in threads:
+        thread.start()
+    for thread in threads[:2]:
+        thread.join()
+    stop.set()
+    threads[2].join()
+
+    assert not errors
+    days = set(store.list_days())
+    assert days == set(recent) | {today.isoformat()}
+    assert store.load_day(today.isoformat())["users"]["7"]["count"] == 100
+    assert store.load_day(recent[-1]) is not None  # 지난 달 묶음으로 옮겨진 날짜도 읽힘
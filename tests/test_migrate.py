@@ -0,0 +1,110 @@
+"""
+데이터 폴더 변환 테스트 (두 번 실행해도 같은지, 중간에 종료돼도 다시 실행할 수 있는지)
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import counter_migrate
+from counter_migrate import (migrate_data_dir, DATA_FORMAT_FILE_NAME, LEGACY_BACKUP_DIR_NAME,
+                             LEGACY_PRESETS_FILE_NAME)
+
+NAMES = [["홍길동", "김철수", "이영희"], ["박민수"], []]
+
+
+def baseline_presets():
+    """이전 버전이 쓰던 presets.json (통합 형식, 사용자 dict + [이름, 누적] 클릭 기록)"""
+    presets = []
+    for i, names in enumerate(NAMES):
+        users, click_history = {}, []
+        for order, name in enumerate(names):
+            users[str(7 + order)] = {"name": name, "count": 0, "order": order}
+        for click in range(len(names) * 4):
+            user = users[str(7 + click % len(names))]
+            user["count"] += 1
+            click_history.append([user["name"], user["count"]])
+        presets.append({"name": f"프리셋 {i + 1}", "users": users, "click_history": click_history})
+    return {"presets": presets, "current_preset": 1,
+            "last_date": datetime.now().strftime("%Y-%m-%d"),
+            "logs": ["[09:00:00] 홍길동 +1 (1)", "[09:00:01] 김철수 +1 (1)"]}
+
+
+@pytest.fixture
+def legacy_dir(data_dir):
+    data = baseline_presets()
+    with open(os.path.join(data_dir, LEGACY_PRESETS_FILE_NAME), 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return data
+
+
+def tree(data_dir):
+    """폴더 안 모든 파일 {상대 경로: 내용}"""
+    files = {}
+    for root, _, names in os.walk(data_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, data_dir)] = f.read()
+    return files
+
+
+def assert_same_as_legacy(engine, data):
+    assert engine.current_preset == data["current_preset"]
+    assert list(engine.recent_logs()) == data["logs"]
+    for index, legacy in enumerate(data["presets"]):
+        engine.ensure_preset(index)
+        preset = engine.presets[index]
+        assert preset["name"] == legacy["name"]
+        assert {key: (user["name"], user["count"]) for key, user in preset["users"].items()} == \
+            {key: (user["name"], user["count"]) for key, user in legacy["users"].items()}
+        assert [(name, count) for name, count, _ in preset["click_history"].events()] == \
+            [tuple(entry) for entry in legacy["click_history"]]
+
+
+def test_migrating_twice_is_idempotent_and_keeps_data(data_dir, legacy_dir, open_engine):
+    original = tree(data_dir)[LEGACY_PRESETS_FILE_NAME]
+    assert migrate_data_dir(data_dir)
+    migrated = tree(data_dir)
+    assert LEGACY_PRESETS_FILE_NAME not in migrated
+    assert migrated[os.path.join(LEGACY_BACKUP_DIR_NAME, LEGACY_PRESETS_FILE_NAME)] == original
+    assert DATA_FORMAT_FILE_NAME in migrated
+
+    assert not migrate_data_dir(data_dir)
+    assert tree(data_dir) == migrated
+    assert_same_as_legacy(open_engine(), legacy_dir)
+
+
+@pytest.mark.parametrize("crash_at", ["write_checkpoint", "backup_legacy_files",
+                                      "write_format_version"])
+def test_interrupted_migration_can_be_rerun(data_dir, legacy_dir, open_engine, monkeypatch, crash_at):
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt  # 전원 차단 흉내 (이 단계부터 아무것도 쓰지 않음)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(counter_migrate, crash_at, crash)
+        with pytest.raises(KeyboardInterrupt):
+            migrate_data_dir(data_dir)
+    assert DATA_FORMAT_FILE_NAME not in tree(data_dir)
+
+    assert migrate_data_dir(data_dir)
+    assert not migrate_data_dir(data_dir)
+    files = tree(data_dir)
+    assert LEGACY_PRESETS_FILE_NAME not in files
+    assert os.path.join(LEGACY_BACKUP_DIR_NAME, LEGACY_PRESETS_FILE_NAME) in files
+    assert_same_as_legacy(open_engine(), legacy_dir)
+
+
+def test_dry_run_writes_nothing(data_dir, legacy_dir, open_engine):
+    before = tree(data_dir)
+    messages = []
+    assert migrate_data_dir(data_dir, dry_run=True, report=messages.append)
+    assert tree(data_dir) == before
+    assert sorted(os.listdir(data_dir)) == [LEGACY_PRESETS_FILE_NAME]
+    assert any(LEGACY_BACKUP_DIR_NAME in message for message in messages)
+    assert any(DATA_FORMAT_FILE_NAME in message for message in messages)
+
+    assert migrate_data_dir(data_dir)
+    assert_same_as_legacy(open_engine(), legacy_dir)
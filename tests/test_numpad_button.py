@@ -0,0 +1,58 @@
+"""
+NumpadButton 다시 그리기 테스트 (화면 없이, PySide6가 있을 때만)
+"""
+
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6.QtWidgets")
+
+from PySide6.QtWidgets import QApplication
+
+from counter_clean import NumpadButton
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_repainting_button_is_stable(app):
+    button = NumpadButton("7", "7")
+    button.show()
+    app.processEvents()
+
+    # 상태/순번/카운트를 바꿔 가며 모든 그리기 경로를 반복
+    # (PySide6 6.12.0처럼 그리기마다 None 참조가 줄면 곧 none_dealloc으로 종료되므로
+    #  그 전에 실패하도록 중간중간 확인)
+    none_refs = sys.getrefcount(None)
+    for i in range(3000):
+        if i % 3 == 0:
+            button.show_user(None)
+        else:
+            button.show_user({"name": "홍길동", "count": i})
+        button.set_highlighted(i % 2 == 0)
+        button.set_order(i % 5)
+        button.setEnabled(i % 7 != 0)
+        button.repaint()
+        if i % 50 == 0:
+            assert sys.getrefcount(None) >= none_refs - 100, f"{i}번째 다시 그리기에서 None 참조 감소"
+    app.processEvents()
+    button.close()
+
+
+def test_disabled_button_uses_disabled_face(app):
+    button = NumpadButton("7", "7")
+    button.show_user({"name": "홍길동", "count": 3})
+    button.set_highlighted(True)
+    enabled_face = button.face_pixmap().toImage()
+
+    button.setEnabled(False)
+    disabled_face = button.face_pixmap().toImage()
+    assert disabled_face != enabled_face
+    button.set_highlighted(False)
+    assert button.face_pixmap().toImage() == disabled_face  # 상태와 관계없이 같은 면
+    button.grab()  # 비활성화 상태로 그려도 오류 없음
@@ -0,0 +1,134 @@
+"""
+체크포인트 + 저널 재생 테스트 (재시작 후 상태가 종료 직전과 같은지)
+"""
+
+import os
+import random
+
+import pytest
+
+from counter_storage import JOURNAL_FILE_NAME
+
+KEYS = ["7", "8", "9", "4", "7@2"]
+NAMES = ["홍길동", "김철수", "이영희", "박민수", "최지우", "정하나", "강다온"]
+
+
+def random_action(engine, rng):
+    """무작위 작업 하나 실행 (GUI에서 할 수 있는 작업만)"""
+    action = rng.choice(["inc"] * 6 + ["reg", "mod", "del", "undo", "redo", "reset", "preset"])
+    key = rng.choice(KEYS)
+    user = engine.user(key)
+    free_names = [name for name in NAMES if not engine.is_duplicate_name(name, key)]
+
+    if action == "inc" and user is not None:
+        engine.increment(key)
+    elif action == "reg" and user is None:
+        engine.register_user(key, rng.choice(free_names))
+    elif action == "mod" and user is not None:
+        engine.modify_user(key, rng.choice(free_names))
+    elif action == "del" and user is not None:
+        engine.delete_user(key)
+    elif action == "undo":
+        engine.undo()
+    elif action == "redo":
+        engine.redo()
+    elif action == "reset":
+        engine.reset_counts()
+    elif action == "preset":
+        engine.switch_preset(rng.randrange(len(engine.presets)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_replay_matches_live_state(open_engine, take_snapshot, preset_state, seed):
+    rng = random.Random(seed)
+    engine = open_engine()
+    for step in range(300):
+        random_action(engine, rng)
+        # 가끔 스냅샷 (나머지는 저널 재생으로 복구되어야 함)
+        if rng.random() < 0.05:
+            take_snapshot(engine)()
+
+    live = preset_state(engine)
+    current_preset = engine.current_preset
+    engine.journal.close()  # 마지막 스냅샷 없이 종료
+
+    reloaded = open_engine()
+    assert preset_state(reloaded) == live
+    assert reloaded.current_preset == current_preset
+
+
+def test_crash_between_preset_write_and_checkpoint(open_engine, take_snapshot, preset_state):
+    engine = open_engine()
+    engine.register_user("7", "홍길동")
+    for _ in range(3):
+        engine.increment("7")
+    take_snapshot(engine)()
+    for _ in range(4):
+        engine.increment("7")
+
+    def presets_only(changed_presets, checkpoint, *args):
+        # 프리셋 파일만 쓰고 체크포인트 전에 종료
+        for index, preset in changed_presets.items():
+            engine.preset_store.save(index, preset)
+
+    take_snapshot(engine, presets_only)()
+    live = preset_state(engine)
+    engine.journal.close()
+
+    reloaded = open_engine()
+    assert reloaded.user("7")["count"] == 7
+    assert preset_state(reloaded) == live
+
+    # 복구한 뒤에도 이어서 쓰고 다시 읽을 수 있어야 함
+    reloaded.increment("7")
+    live = preset_state(reloaded)
+    reloaded.journal.close()
+    assert preset_state(open_engine()) == live
+
+
+def test_torn_last_journal_line_is_truncated(open_engine, data_dir, preset_state):
+    engine = open_engine()
+    engine.register_user("7", "홍길동")
+    for _ in range(5):
+        engine.increment("7")
+    live = preset_state(engine)
+    engine.journal.close()
+
+    # 기록 도중 종료: 마지막 줄이 줄바꿈 없이 잘림
+    journal_path = os.path.join(data_dir, JOURNAL_FILE_NAME)
+    valid_size = os.path.getsize(journal_path)
+    with open(journal_path, 'ab') as f:
+        f.write(b'{"seq": 8, "op": "inc", "k": "7", "n": "\xed\x99')
+
+    reloaded = open_engine()
+    assert preset_state(reloaded) == live
+    assert os.path.getsize(journal_path) == valid_size
+
+    # 잘린 줄을 지운 뒤 이어 쓴 레코드도 재생되어야 함
+    reloaded.increment("7")
+    live = preset_state(reloaded)
+    reloaded.journal.close()
+    reloaded = open_engine()
+    assert reloaded.user("7")["count"] == 6
+    assert preset_state(reloaded) == live
+
+
+def test_undo_click_of_deleted_user_is_replayed(open_engine, preset_state):
+    engine = open_engine()
+    events = []
+    engine.add_listener(lambda event, key: events.append((event, key)))
+    engine.register_user("7", "홍길동")
+    engine.increment("7")
+    engine.increment("7")
+    engine.delete_user("7")
+    engine.undo_stack.clear()  # 재시작 직후처럼 취소 기록 없이 클릭 기록만 남음
+
+    events.clear()
+    assert engine.undo()
+    assert events == [("undo", None)]
+    assert len(engine.click_history) == 1
+    assert engine.total_count() == 0
+
+    live = preset_state(engine)
+    engine.journal.close()  # 스냅샷 없이 종료
+    assert preset_state(open_engine()) == live
@@ -0,0 +1,87 @@
+"""
+BackgroundWriter 합치기 테스트 (대체되거나 실패한 스냅샷의 프리셋이 사라지지 않는지)
+"""
+
+import threading
+
+from counter_storage import BackgroundWriter
+
+
+def click(engine, key, name, times):
+    if engine.user(key) is None:
+        engine.register_user(key, name)
+    for _ in range(times):
+        engine.increment(key)
+
+
+def blocked(job, started, release):
+    """release될 때까지 기다렸다가 쓰는 작업으로 바꿈 (저장이 오래 걸리는 상황)"""
+    write = job.write
+
+    def blocked_write(*args):
+        started.set()
+        release.wait()
+        write(*args)
+
+    job.write = blocked_write
+    return job
+
+
+def test_replaced_pending_snapshot_keeps_its_presets(open_engine, take_snapshot, preset_state):
+    engine = open_engine()
+    writer = BackgroundWriter()
+    started, release = threading.Event(), threading.Event()
+    try:
+        # A: 쓰는 중 (멈춰 있음)
+        click(engine, "7", "홍길동", 1)
+        writer.submit(blocked(take_snapshot(engine), started, release))
+        assert started.wait(5)
+
+        # B: 프리셋 0만 바뀜 → 대기
+        click(engine, "7", "홍길동", 5)
+        writer.submit(take_snapshot(engine))
+
+        # C: 프리셋 1로 전환 후 클릭 → B를 대체
+        engine.switch_preset(1)
+        click(engine, "8", "김철수", 2)
+        writer.submit(take_snapshot(engine))
+
+        release.set()
+        assert writer.flush(5)
+    finally:
+        release.set()
+        writer.stop()
+
+    live = preset_state(engine)
+    engine.journal.close()
+    reloaded = open_engine()
+    assert reloaded.presets[0]["users"]["7"]["count"] == 6
+    assert preset_state(reloaded) == live
+
+
+def test_failed_snapshot_is_written_with_the_next_one(open_engine, take_snapshot, preset_state):
+    engine = open_engine()
+    writer = BackgroundWriter()
+    try:
+        click(engine, "7", "홍길동", 3)
+        failing = take_snapshot(engine)
+
+        def fail(*args):
+            raise OSError(28, "No space left on device")
+
+        failing.write = fail
+        writer.submit(failing)
+        assert writer.flush(5)
+        assert isinstance(writer.take_error(), OSError)
+
+        engine.switch_preset(1)
+        click(engine, "8", "김철수", 1)
+        writer.submit(take_snapshot(engine))
+        assert writer.flush(5)
+        assert writer.take_error() is None
+    finally:
+        writer.stop()
+
+    live = preset_state(engine)
+    engine.journal.close()
+    assert preset_state(open_engine()) == live